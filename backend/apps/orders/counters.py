@@ -0,0 +1,110 @@
+# backend/apps/orders/counters.py
+"""
+Maintenance des compteurs de ventes (SalesCounter).
+
+Chaque commande est comptée dans le document (jour de création, statut).
+Un changement de statut déplace la commande d'un compteur à l'autre :
+-1 sur l'ancien statut, +1 sur le nouveau, en un seul bulk_write.
+
+Le chiffre d'affaires est compté en centimes entiers (revenue_cents) :
+des $inc en float accumuleraient des erreurs d'arrondi et s'écarteraient
+du calcul live sur les final_total.
+"""
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+from pymongo import UpdateOne
+
+from .models import Order, SalesCounter
+
+
+def day_of(dt):
+    """Tronque une date au jour (minuit)"""
+    dt = dt or datetime.utcnow()
+    return datetime(dt.year, dt.month, dt.day)
+
+
+def to_cents(amount):
+    """Montant (Decimal, float...) -> centimes entiers"""
+    return int((Decimal(str(amount or 0)) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def _increment(order, status, sign):
+    return UpdateOne(
+        {'day': day_of(order.created_at), 'status': status},
+        {'$inc': {'orders': sign, 'revenue_cents': sign * to_cents(order.final_total)}},
+        upsert=True
+    )
+
+
+def _apply(operations):
+    SalesCounter._get_collection().bulk_write(operations, ordered=False)
+
+
+def record_order(order, sign=1):
+    """Nouvelle commande (sign=1) ou commande supprimée (sign=-1)"""
+    _apply([_increment(order, order.status, sign)])
+
+
+def record_status_change(order, previous_status, new_status):
+    """Déplace la commande du compteur `previous_status` vers `new_status`"""
+    if previous_status == new_status:
+        return
+    _apply([
+        _increment(order, previous_status, -1),
+        _increment(order, new_status, 1),
+    ])
+
+
+def rebuild_sales_counters():
+    """
+    Recalcule tous les compteurs depuis la collection Order (une agrégation).
+    Retourne le nombre de compteurs écrits.
+    """
+    pipeline = [
+        {'$match': {'created_at': {'$ne': None}}},
+        {'$group': {
+            '_id': {
+                'day': {'$dateFromParts': {
+                    'year': {'$year': '$created_at'},
+                    'month': {'$month': '$created_at'},
+                    'day': {'$dayOfMonth': '$created_at'},
+                }},
+                'status': '$status',
+            },
+            'orders': {'$sum': 1},
+            # Arrondi au centime commande par commande, comme to_cents()
+            'revenue_cents': {'$sum': {'$round': [{'$multiply': ['$final_total', 100]}, 0]}},
+        }},
+    ]
+    rows = list(Order.objects.aggregate(pipeline))
+
+    # Pas de delete_many({}) préalable : le dashboard lirait des zéros pendant
+    # la reconstruction. On écrase chaque compteur en place ($set + upsert)...
+    collection = SalesCounter._get_collection()
+    fresh = set()
+    operations = []
+    for row in rows:
+        key = (row['_id']['day'], row['_id']['status'])
+        fresh.add(key)
+        operations.append(UpdateOne(
+            {'day': key[0], 'status': key[1]},
+            {
+                '$set': {'orders': row['orders'], 'revenue_cents': int(row['revenue_cents'] or 0)},
+                # Ancien compteur en float
+                '$unset': {'revenue': 1},
+            },
+            upsert=True
+        ))
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+
+    # ... puis on supprime les compteurs qui ne correspondent plus à rien
+    stale = [
+        doc['_id']
+        for doc in collection.find({}, {'day': 1, 'status': 1})
+        if (doc.get('day'), doc.get('status')) not in fresh
+    ]
+    if stale:
+        collection.delete_many({'_id': {'$in': stale}})
+    return len(rows)
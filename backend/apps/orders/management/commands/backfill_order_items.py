@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from apps.orders.models import Order
+from apps.products.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Copie titre, prix et image des produits dans les lignes des anciennes "
+        "commandes, pour que l'affichage des commandes ne lise plus les produits"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        orders = Order._get_collection()
+        products = Product._get_collection()
+
+        # Commandes dont au moins une ligne n'a pas encore son instantané
+        cursor = orders.find(
+            {'items': {'$elemMatch': {'$or': [
+                {'image': {'$exists': False}},
+                {'product_title': None},
+                {'price_at_purchase': None},
+            ]}}},
+            {'items': 1},
+            batch_size=batch_size,
+        )
+
+        updated = 0
+        batch = []
+        for order in cursor:
+            batch.append(order)
+            if len(batch) >= batch_size:
+                updated += self._backfill(batch, orders, products)
+                batch = []
+        if batch:
+            updated += self._backfill(batch, orders, products)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {updated} commandes mises à jour"))
+
+    def _backfill(self, batch, orders, products):
+        # Une requête $in pour tous les produits du lot
+        product_ids = {item.get('product') for order in batch for item in order.get('items', [])}
+        product_ids.discard(None)
+        by_id = {
+            p['_id']: p
+            for p in products.find(
+                {'_id': {'$in': list(product_ids)}},
+                {'title': 1, 'price': 1, 'image': 1, 'image_path': 1}
+            )
+        }
+
+        operations = []
+        for order in batch:
+            items = order.get('items', [])
+            for item in items:
+                product = by_id.get(item.get('product'), {})
+                if item.get('product_title') is None:
+                    item['product_title'] = product.get('title')
+                if item.get('price_at_purchase') is None:
+                    item['price_at_purchase'] = product.get('price')
+                if 'image' not in item:
+                    item['image'] = product.get('image') or product.get('image_path') or ''
+            operations.append(UpdateOne({'_id': order['_id']}, {'$set': {'items': items}}))
+
+        if operations:
+            orders.bulk_write(operations, ordered=False)
+        return len(operations)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.orders.counters import rebuild_sales_counters
+
+
+class Command(BaseCommand):
+    help = "Recalcule les compteurs de ventes (SalesCounter) depuis toutes les commandes"
+
+    def handle(self, *args, **options):
+        count = rebuild_sales_counters()
+        self.stdout.write(self.style.SUCCESS(f"✅ {count} compteurs reconstruits"))
@@ -1,13 +1,21 @@
 import mongoengine as me
 from datetime import datetime
 from apps.users.models import User
-from apps.products.models import Product
 
-class OrderItem(me.EmbeddedDocument):
-    product = me.ReferenceField(Product, required=True)
-    product_title = me.StringField()
-    quantity = me.IntField(default=1)
-    price_at_purchase = me.DecimalField(precision=2)
+def order_item(product, quantity, unit_price, image):
+    """
+    Ligne de commande : instantané du produit au moment de l'achat.
+    Dictionnaire simple (même format en base que l'ancien OrderItem) :
+    la lecture d'une commande ne déréférence jamais les produits.
+    """
+    return {
+        'product': product.id,
+        'product_title': product.title,
+        'quantity': quantity,
+        'price_at_purchase': float(unit_price),
+        # Chemin de l'image du produit (même format que Product.image)
+        'image': image,
+    }
 
 class Order(me.Document):
     STATUS_CHOICES = (
@@ -28,7 +36,8 @@ class Order(me.Document):
     address = me.StringField(required=True)
     city = me.StringField(required=True)
     
-    items = me.ListField(me.EmbeddedDocumentField(OrderItem))
+    # Lignes : voir order_item()
+    items = me.ListField(me.DictField())
     
     # --- Financier ---
     items_total = me.DecimalField(precision=2, default=0.0) # Total produits
@@ -43,6 +52,37 @@ class Order(me.Document):
     
     status = me.StringField(choices=STATUS_CHOICES, default='PENDING')
     created_at = me.DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'indexes': [
+            # Liste admin (pagination par curseur + filtres) et "Mes commandes"
+            ('-created_at', '-id'),
+            ('status', '-created_at', '-id'),
+            ('user', '-created_at', '-id'),
+            ('city', '-created_at', '-id'),
+            # Recherche par préfixe (email / téléphone)
+            'email',
+            'phone',
+        ]
+    }
     
     def __str__(self):
-        return f"CMD {str(self.id)[-6:]} - {self.full_name}"
\ No newline at end of file
+        return f"CMD {str(self.id)[-6:]} - {self.full_name}"
+
+class SalesCounter(me.Document):
+    """
+    Compteurs de ventes matérialisés : un document par (jour, statut).
+    Mis à jour par $inc à chaque création / changement de statut de commande
+    (voir counters.py), ce qui évite de relire toute la collection Order.
+    """
+    day = me.DateTimeField(required=True)   # Minuit (UTC) du jour de création de la commande
+    status = me.StringField(required=True)
+    orders = me.IntField(default=0)
+    revenue_cents = me.IntField(default=0)   # CA en centimes (pas de dérive des $inc en float)
+
+    meta = {
+        'collection': 'sales_counters',
+        'indexes': [
+            {'fields': ['day', 'status'], 'unique': True}
+        ]
+    }
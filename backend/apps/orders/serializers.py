@@ -1,7 +1,6 @@
 from rest_framework import serializers
 from .models import Order
-from django.conf import settings
-from django.core.files.storage import default_storage
+from apps.products.images import image_url
 
 class OrderItemInputSerializer(serializers.Serializer):
     """Format attendu depuis le React pour la création"""
@@ -25,47 +24,22 @@ class OrderSerializer(serializers.Serializer):
     items = serializers.SerializerMethodField()
 
     def get_items(self, obj):
+        """
+        Lignes de commande rendues uniquement depuis les données copiées
+        au moment de l'achat : aucun accès à la collection Product.
+        """
         details = []
-        try:
-            # On vérifie si la commande a des items
-            items_list = getattr(obj, 'items', [])
-            
-            for item in items_list:
-                product = item.product 
-                
-                # --- INITIALISATION DES VARIABLES ---
-                title = "Produit Inconnu"
-                unit_price = 0.0
-                img_url = None
-                
-                if product:
-                    title = product.title
-                    # 👇 LA CORRECTION EST ICI 👇
-                    # On prend le prix du PRODUIT, car l'item ne l'a pas stocké
-                    unit_price = float(product.price) if product.price else 0.0
-                    
-                    # Gestion Image
-                    if product.image:
-                        try:
-                            if str(product.image).startswith('http'):
-                                img_url = str(product.image)
-                            else:
-                                img_url = default_storage.url(str(product.image))
-                        except:
-                            img_url = f"{settings.MEDIA_URL}{product.image}"
+        for item in obj.items or []:
+            price = item.get('price_at_purchase')
+            unit_price = float(price) if price is not None else 0.0
+            quantity = item.get('quantity') or 0
 
-                # Calcul du total pour cette ligne
-                total_line = unit_price * item.quantity
+            details.append({
+                "title": item.get('product_title') or "Produit Inconnu",
+                "quantity": quantity,
+                "price": unit_price,                # Prix unitaire
+                "total": unit_price * quantity,     # Total ligne
+                "image": image_url(item.get('image'))
+            })
 
-                details.append({
-                    "title": title,
-                    "quantity": item.quantity,
-                    "price": unit_price,    # Prix unitaire
-                    "total": total_line,    # Total ligne
-                    "image": img_url
-                })
-                
-        except Exception as e:
-            print(f"❌ Erreur lecture items: {e}")
-            
-        return details
\ No newline at end of file
+        return details
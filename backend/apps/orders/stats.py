@@ -0,0 +1,168 @@
+# backend/apps/orders/stats.py
+"""
+Statistiques du dashboard admin.
+
+- counter_stats() : lit les compteurs matérialisés SalesCounter (un document
+  par jour et par statut) -> coût proportionnel au nombre de jours.
+- dashboard_stats() : recalcul complet par un pipeline d'agrégation ($facet)
+  sur la collection Order, sans charger de documents en Python.
+"""
+from datetime import datetime, timedelta
+
+from apps.products.models import Product
+from apps.users.models import User
+from .models import Order, SalesCounter
+
+# Statuts comptés dans le chiffre d'affaires
+REVENUE_STATUSES = ['VALIDATED', 'SHIPPED', 'DELIVERED']
+
+# Granularités de la courbe de CA -> format $dateToString
+BUCKET_FORMATS = {
+    'day': '%Y-%m-%d',
+    'week': '%G-W%V',  # semaine ISO, ex : 2025-W07
+}
+
+
+def parse_day(value):
+    """'2025-01-31' -> datetime (lève ValueError si le format est invalide)"""
+    return datetime.strptime(value, '%Y-%m-%d')
+
+
+def created_at_filter(date_from=None, date_to=None):
+    """Filtre Mongo sur created_at ; date_to est inclusive (journée entière)"""
+    bounds = {}
+    if date_from:
+        bounds['$gte'] = date_from
+    if date_to:
+        bounds['$lt'] = date_to + timedelta(days=1)
+    return {'created_at': bounds} if bounds else {}
+
+
+def _count_facet(document):
+    """Compte d'une autre collection, greffé dans le $facet via $lookup"""
+    return [
+        {'$limit': 1},
+        {'$lookup': {
+            'from': document._get_collection_name(),
+            'pipeline': [{'$count': 'n'}],
+            'as': 'count',
+        }},
+    ]
+
+
+def dashboard_stats(date_from=None, date_to=None, bucket=None):
+    """
+    Calcule les chiffres du dashboard en un aller-retour.
+    bucket : None, 'day' ou 'week' -> ajoute la série "revenue_series".
+    """
+    revenue_match = {'$match': {'status': {'$in': REVENUE_STATUSES}}}
+    facets = {
+        'revenue': [revenue_match, {'$group': {'_id': None, 'total': {'$sum': '$final_total'}}}],
+        'by_status': [{'$group': {'_id': '$status', 'count': {'$sum': 1}}}],
+        'users': _count_facet(User),
+        'products': _count_facet(Product),
+    }
+    if bucket:
+        facets['series'] = [
+            revenue_match,
+            {'$group': {
+                '_id': {'$dateToString': {'format': BUCKET_FORMATS[bucket], 'date': '$created_at'}},
+                'revenue': {'$sum': '$final_total'},
+                'orders': {'$sum': 1},
+            }},
+            {'$sort': {'_id': 1}},
+        ]
+
+    pipeline = []
+    match = created_at_filter(date_from, date_to)
+    if match:
+        pipeline.append({'$match': match})
+    pipeline.append({'$facet': facets})
+
+    result = next(iter(Order.objects.aggregate(pipeline)), {})
+
+    by_status = {row['_id']: row['count'] for row in result.get('by_status', [])}
+    revenue = result['revenue'][0]['total'] if result.get('revenue') else 0
+
+    def lookup_count(name, document):
+        rows = result.get(name)
+        if rows:
+            return rows[0]['count'][0]['n'] if rows[0]['count'] else 0
+        # Aucune commande dans la période : le $lookup n'a pas pu s'exécuter
+        return document.objects.count()
+
+    stats = {
+        "total_orders": sum(by_status.values()),
+        "pending_orders": by_status.get('PENDING', 0),
+        "orders_by_status": by_status,
+        "total_users": lookup_count('users', User),
+        "total_products": lookup_count('products', Product),
+        "revenue": round(revenue or 0, 2),
+    }
+    if bucket:
+        stats["revenue_series"] = [
+            {"period": row['_id'], "revenue": round(row['revenue'] or 0, 2), "orders": row['orders']}
+            for row in result.get('series', [])
+        ]
+    return stats
+
+
+def _period(day, bucket):
+    if bucket == 'week':
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    return day.strftime(BUCKET_FORMATS['day'])
+
+
+def counters_ready():
+    """
+    Les compteurs sont-ils initialisés ? Sur un déploiement neuf, tant que
+    `manage.py rebuild_sales_counters` n'a pas tourné, la collection est
+    vide alors que des commandes existent : il faut le calcul live. Idem
+    tant que des compteurs de l'ancien format (CA en float) subsistent.
+    """
+    counters = SalesCounter._get_collection()
+    if counters.estimated_document_count():
+        # Anciens compteurs (CA en float) : calcul live jusqu'à la reconstruction
+        return counters.find_one({'revenue': {'$exists': True}}, {'_id': 1}) is None
+    return not Order._get_collection().estimated_document_count()
+
+
+def counter_stats(date_from=None, date_to=None, bucket=None):
+    """Mêmes chiffres que dashboard_stats(), lus depuis les SalesCounter"""
+    query = {}
+    if date_from:
+        query['day__gte'] = date_from
+    if date_to:
+        query['day__lte'] = date_to
+
+    by_status = {}
+    revenue_cents = 0
+    series = {}
+    for row in SalesCounter.objects(**query).order_by('day').as_pymongo():
+        status, orders = row['status'], row.get('orders', 0)
+        if orders:
+            by_status[status] = by_status.get(status, 0) + orders
+        if status in REVENUE_STATUSES:
+            revenue_cents += row.get('revenue_cents', 0)
+            if bucket:
+                point = series.setdefault(_period(row['day'], bucket), {"revenue_cents": 0, "orders": 0})
+                point["revenue_cents"] += row.get('revenue_cents', 0)
+                point["orders"] += orders
+
+    stats = {
+        "total_orders": sum(by_status.values()),
+        "pending_orders": by_status.get('PENDING', 0),
+        "orders_by_status": by_status,
+        # Métadonnées de collection : pas de parcours des documents
+        "total_users": User._get_collection().estimated_document_count(),
+        "total_products": Product._get_collection().estimated_document_count(),
+        "revenue": revenue_cents / 100,
+    }
+    if bucket:
+        stats["revenue_series"] = [
+            {"period": period, "revenue": point["revenue_cents"] / 100, "orders": point["orders"]}
+            for period, point in series.items()
+            if point["orders"]
+        ]
+    return stats
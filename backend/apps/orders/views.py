@@ -3,8 +3,11 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from decimal import Decimal
+from bson import ObjectId
+from apps.products.images import image_path_of
 from apps.products.models import Product
-from .models import Order, OrderItem
+from .models import Order, order_item
+from .counters import record_order
 from .serializers import OrderItemInputSerializer, OrderSerializer
 
 # --- VUE DE CRÉATION DE COMMANDE (Invité + Fidélité) ---
@@ -29,27 +32,46 @@ class CreateOrderView(APIView):
         if not items_data:
             return Response({"error": "Panier vide"}, status=400)
 
+        # 3. Chargement groupé du panier : une seule requête $in,
+        # limitée aux champs utiles au calcul
+        quantities = {}
+        for item in items_data:
+            quantities[item['product_id']] = quantities.get(item['product_id'], 0) + item['quantity']
+
+        valid_ids = [pid for pid in quantities if ObjectId.is_valid(pid)]
+        products = {
+            str(p.id): p
+            for p in Product.objects(id__in=valid_ids).only('price', 'title', 'stock', 'is_active', 'image', 'image_path')
+        }
+
+        # 4. Vérification de TOUT le panier avant la moindre écriture
+        unavailable = []
+        for product_id, quantity in quantities.items():
+            product = products.get(product_id)
+            if not product or not product.is_active:
+                unavailable.append({"product_id": product_id, "error": "Produit introuvable ou indisponible"})
+            elif (product.stock or 0) < quantity:
+                unavailable.append({
+                    "product_id": product_id,
+                    "title": product.title,
+                    "error": f"Stock insuffisant ({product.stock or 0} disponible)"
+                })
+
+        if unavailable:
+            return Response({"error": "Certains produits ne peuvent pas être commandés", "items": unavailable}, status=400)
+
+        # 5. Construction des lignes et calcul du total (Decimal, un seul passage)
         order_items = []
         items_total = Decimal('0.00')
 
-        # 3. Construction des lignes de commande
         for item in items_data:
-            product = Product.objects(id=item['product_id']).first()
-            if product:
-                line_total = product.price * item['quantity']
-                items_total += line_total
-                
-                order_items.append(OrderItem(
-                    product=product,
-                    product_title=product.title,
-                    quantity=item['quantity'],
-                    price_at_purchase=product.price
-                ))
-
-        if not order_items:
-             return Response({"error": "Produits introuvables"}, status=400)
-
-        # 4. Gestion Logged In vs Invité & Fidélité
+            product = products[item['product_id']]
+            unit_price = Decimal(product.price)
+            items_total += unit_price * item['quantity']
+
+            order_items.append(order_item(product, item['quantity'], unit_price, image_path_of(product)))
+
+        # 6. Gestion Logged In vs Invité & Fidélité
         user = None
         points_used = Decimal('0.00')
         discount = Decimal('0.00')
@@ -69,14 +91,14 @@ class CreateOrderView(APIView):
                 points_used = max_usable
                 discount = max_usable
 
-        # 5. Calcul Final
+        # 7. Calcul Final
         shipping = Decimal('7.00')
         final_total = items_total + shipping - discount
         
         if final_total < 0: final_total = Decimal('0.00')
 
         try:
-            # 6. Création de la commande
+            # 8. Création de la commande
             order = Order(
                 user=user,
                 full_name=data.get('full_name'),
@@ -94,8 +116,13 @@ class CreateOrderView(APIView):
                 status='PENDING'
             )
             order.save()
+
+            try:
+                record_order(order)
+            except Exception as e:
+                print(f"Erreur compteurs: {e}")
             
-            # 7. Débit immédiat des points utilisés
+            # 9. Débit immédiat des points utilisés
             if user and points_used > 0:
                 user.points = Decimal(user.points) - points_used
                 user.save()
@@ -1,13 +1,22 @@
-import os
-import uuid
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAdminUser
-from rest_framework.parsers import MultiPartParser, FormParser 
-from django.core.files.storage import default_storage
+from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from django.http import StreamingHttpResponse
 
-from .models import Product, Category
+from core.streaming import stream_json_list
+from bson import ObjectId
+
+from .bulk import (
+    FORMATS, MAX_INVENTORY_ITEMS,
+    apply_inventory_updates, detect_format, export_products, import_products,
+)
+from .cache import invalidate_catalog
+from .models import Product
+from .prefetch import prefetch_categories
+from .registry import category_registry
 from .serializers import ProductSerializer
+from .uploads import IMAGE_PENDING, enqueue_upload, spool_upload
 
 # ---------------------------------------------------------
 # VUE 1 : LISTE ET CRÉATION DE PRODUITS
@@ -17,16 +26,16 @@ class AdminProductListCreateView(APIView):
     parser_classes = (MultiPartParser, FormParser)
 
     def get(self, request):
-        """Liste tous les produits"""
-        products = Product.objects.all()
+        """Liste tous les produits (envoyée en flux, par lots)"""
         # Le context={'request': request} est crucial pour que le Serializer
         # génère l'URL complète (http://.../media/...) ou l'URL Cloudinary
-        serializer = ProductSerializer(
-            products, 
-            many=True, 
-            context={'request': request}
+        return stream_json_list(
+            Product.objects.all(),
+            ProductSerializer,
+            context={'request': request},
+            # Catégories résolues une fois par lot au lieu d'une fois par produit
+            prepare=lambda batch: {'categories': prefetch_categories(batch)}
         )
-        return Response(serializer.data)
 
     def post(self, request):
         """Crée un nouveau produit"""
@@ -39,43 +48,19 @@ class AdminProductListCreateView(APIView):
             if not category_id:
                 return Response({"error": "Catégorie requise"}, status=400)
             
-            category = Category.objects(id=category_id).first()
+            # Vérification via le registre en mémoire (pas de requête)
+            category = category_registry.get(category_id)
             if not category:
                 return Response({"error": "Catégorie invalide"}, status=400)
 
             # 2. Traitement de l'image
-            path_to_store = ""
+            # Le fichier est copié dans le spool local puis envoyé vers
+            # Cloudinary (ou le disque) par uploads.py.
+            pending_path = None
             
             if 'image' in request.FILES:
                 try:
-                    file = request.FILES['image']
-                    
-                    # a. Gestion de l'extension
-                    ext = os.path.splitext(file.name)[1].lower()
-                    if not ext:
-                        ext = '.jpg'
-                    
-                    # b. Génération nom unique (UUID)
-                    # Cela évite les conflits de noms sur Cloudinary
-                    unique_name = f"{uuid.uuid4().hex}{ext}"
-                    target_path = f"products/{unique_name}"
-                    
-                    # c. SAUVEGARDE VIA DEFAULT_STORAGE
-                    # Si settings.DEFAULT_FILE_STORAGE est Cloudinary, ça part dans le cloud.
-                    # Si c'est local, ça part sur le disque.
-                    saved_path = default_storage.save(target_path, file)
-                    
-                    # d. Nettoyage du chemin
-                    # On normalise les slashs pour la BDD
-                    path_to_store = saved_path.replace('\\', '/')
-                    
-                    # Hack pour le Local : si Django renvoie "media/products/...", on nettoie.
-                    # Cloudinary renvoie généralement juste "products/...", donc cette condition sera fausse et ignorée (ce qui est bien).
-                    if path_to_store.startswith('media/'):
-                        path_to_store = path_to_store.replace('media/', '', 1)
-
-                    print(f"✅ Image sauvegardée sous : {path_to_store}")
-                    
+                    pending_path = spool_upload(request.FILES['image'])
                 except Exception as img_error:
                     print(f"❌ Erreur sauvegarde image : {img_error}")
                     return Response({"error": "Erreur lors de l'upload de l'image"}, status=400)
@@ -86,17 +71,24 @@ class AdminProductListCreateView(APIView):
                 description=data.get('description', ''),
                 price=float(data.get('price')),
                 stock=int(data.get('stock', 0)),
-                category=category,
-                image=path_to_store, # On stocke le chemin relatif
+                category=ObjectId(category['id']),
                 is_active=True # Par défaut actif
             )
+            if pending_path:
+                product.image_status = IMAGE_PENDING
+                product.image_pending = pending_path
             # Gestion explicite de is_active si envoyé
             if 'is_active' in data:
                  product.is_active = data['is_active'] in ['true', 'True', True, '1']
 
             product.save()
+            invalidate_catalog()
+            if pending_path:
+                enqueue_upload(product.id, pending_path)
+                # Envoi fait dans la requête (mode par défaut) : image à jour
+                product.reload()
             
-            # 4. Retour
+            # 4. Retour (image_status = "pending" si l'envoi tourne en arrière-plan)
             serializer = ProductSerializer(product, context={'request': request})
             return Response(serializer.data, status=201)
             
@@ -123,25 +115,12 @@ class AdminProductDetailView(APIView):
         data = request.data
         
         try:
-            # 1. Mise à jour Image
+            # 1. Mise à jour Image (l'ancienne reste affichée jusqu'à la fin de l'envoi)
+            pending_path = None
             if 'image' in request.FILES:
-                file = request.FILES['image']
-                
-                ext = os.path.splitext(file.name)[1].lower()
-                if not ext: ext = '.jpg'
-                
-                unique_name = f"{uuid.uuid4().hex}{ext}"
-                target_path = f"products/{unique_name}"
-                
-                # Sauvegarde (Cloudinary ou Local)
-                saved_path = default_storage.save(target_path, file)
-                
-                # Nettoyage
-                clean_path = saved_path.replace('\\', '/')
-                if clean_path.startswith('media/'):
-                     clean_path = clean_path.replace('media/', '', 1)
-                
-                product.image = clean_path
+                pending_path = spool_upload(request.FILES['image'])
+                product.image_status = IMAGE_PENDING
+                product.image_pending = pending_path
             
             # 2. Mise à jour des champs texte
             if 'title' in data: product.title = data['title']
@@ -156,10 +135,15 @@ class AdminProductDetailView(APIView):
             if 'category' in data:
                 cat_id = data['category']
                 if cat_id:
-                    cat = Category.objects(id=cat_id).first()
-                    if cat: product.category = cat
+                    cat = category_registry.get(cat_id)
+                    if cat: product.category = ObjectId(cat['id'])
             
             product.save()
+            invalidate_catalog()
+            if pending_path:
+                enqueue_upload(product.id, pending_path)
+                # Envoi fait dans la requête (mode par défaut) : image à jour
+                product.reload()
             
             serializer = ProductSerializer(product, context={'request': request})
             return Response(serializer.data)
@@ -179,6 +163,77 @@ class AdminProductDetailView(APIView):
             # pour éviter de supprimer une image utilisée ailleurs,
             # mais on supprime l'entrée en BDD.
             product.delete()
+            invalidate_catalog()
             return Response({"message": "Produit supprimé"}, status=200)
         except Exception as e:
-            return Response({"error": str(e)}, status=500)
\ No newline at end of file
+            return Response({"error": str(e)}, status=500)
+
+
+# ---------------------------------------------------------
+# VUE 3 : IMPORT / EXPORT EN MASSE (CSV ou JSONL)
+# ---------------------------------------------------------
+class AdminProductImportView(APIView):
+    permission_classes = [IsAdminUser]
+    parser_classes = (MultiPartParser, FormParser)
+
+    def post(self, request):
+        """
+        Importe un fichier (champ "file") : upsert par slug, par lots.
+        ?fmt=csv|jsonl (sinon déduit de l'extension du fichier).
+        """
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({"error": "Fichier requis (champ 'file')"}, status=400)
+
+        fmt = detect_format(upload.name, request.query_params.get('fmt'))
+        print(f"--- IMPORT PRODUITS ({fmt}) : {upload.name} ---")
+        try:
+            report = import_products(upload, fmt)
+        except UnicodeDecodeError:
+            return Response({"error": "Le fichier doit être encodé en UTF-8"}, status=400)
+        except Exception as e:
+            print(f"❌ Erreur import : {e}")
+            return Response({"error": str(e)}, status=400)
+
+        print(f"✅ Import : {report['created']} créés, {report['updated']} mis à jour, {len(report['errors'])} erreurs")
+        return Response(report, status=200)
+
+
+class AdminProductExportView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """Exporte tout le catalogue en flux (?fmt=csv|jsonl, csv par défaut)"""
+        fmt = request.query_params.get('fmt', 'csv')
+        if fmt not in FORMATS:
+            return Response({"error": f"Format inconnu : {fmt}"}, status=400)
+
+        content_type = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+        response = StreamingHttpResponse(export_products(fmt), content_type=f"{content_type}; charset=utf-8")
+        response['Content-Disposition'] = f'attachment; filename="products.{fmt}"'
+        return response
+
+
+# ---------------------------------------------------------
+# VUE 4 : MISE À JOUR D'INVENTAIRE EN MASSE
+# ---------------------------------------------------------
+class AdminInventoryUpdateView(APIView):
+    permission_classes = [IsAdminUser]
+    parser_classes = (JSONParser,)
+
+    def post(self, request):
+        """
+        Corps : [{"id" ou "slug", "price"?, "stock"?, "stock_delta"?, "is_active"?}, ...]
+        (ou {"items": [...]}). Résultat détaillé ligne par ligne ; un
+        stock_delta négatif supérieur au stock disponible est refusé.
+        """
+        items = request.data.get('items') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({"error": "Liste de mises à jour requise"}, status=400)
+        if len(items) > MAX_INVENTORY_ITEMS:
+            return Response({"error": f"Maximum {MAX_INVENTORY_ITEMS} lignes par appel"}, status=400)
+
+        report = apply_inventory_updates(items)
+        print(f"--- INVENTAIRE : {report['updated']} mis à jour, {report['errors']} erreurs ---")
+        return Response(report, status=200)
+
@@ -0,0 +1,404 @@
+# backend/apps/products/bulk.py
+"""
+Import / export du catalogue en masse (CSV ou JSONL).
+
+Import : le fichier est lu ligne par ligne, chaque ligne est validée puis
+les produits sont enregistrés par lots (upsert par slug) avec un seul
+bulk_write par lot. Les erreurs sont rapportées ligne par ligne, les
+lignes valides sont enregistrées quand même.
+
+Export : génère le catalogue au fil de l'eau (curseur MongoDB par lots),
+sans construire tout le fichier en mémoire.
+
+Inventaire : applique des milliers de mises à jour prix / stock en
+quelques bulk_write ($set / $inc), sans relire ni resauver chaque produit.
+Un retrait de stock (stock_delta négatif) est conditionné au stock
+disponible, comme la réservation (stock.py) : il est appliqué ligne par
+ligne pour savoir lesquels ont été refusés.
+"""
+import codecs
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from bson import ObjectId
+from django.utils.text import slugify
+from mongoengine.errors import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from .cache import invalidate_catalog
+from .facets import TRUE_VALUES
+from .models import Product
+from .registry import category_registry
+from .search import search_index
+
+# Colonnes reconnues (import et export, dans cet ordre)
+COLUMNS = ('slug', 'title', 'price', 'stock', 'category', 'description', 'image', 'source_url', 'is_active')
+FORMATS = ('csv', 'jsonl')
+BATCH_SIZE = 500
+# Nombre maximum de lignes par appel à l'API d'inventaire
+MAX_INVENTORY_ITEMS = 10000
+
+
+class ImportRowError(ValueError):
+    """Ligne invalide (le message est renvoyé tel quel à l'admin)"""
+
+
+# =========================================================
+# LECTURE DU FICHIER
+# =========================================================
+def detect_format(filename, requested=None):
+    """'csv' ou 'jsonl' d'après le paramètre ?fmt= ou l'extension du fichier"""
+    if requested in FORMATS:
+        return requested
+    name = (filename or '').lower()
+    if name.endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    return 'csv'
+
+
+def iter_rows(upload, fmt):
+    """Produit (numéro de ligne, dict ou ImportRowError) sans tout charger en mémoire"""
+    # UploadedFile s'itère ligne par ligne (par morceaux en interne)
+    lines = codecs.iterdecode(upload, 'utf-8-sig')
+
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, ImportRowError(f"JSON invalide : {e}")
+            continue
+        if not isinstance(row, dict):
+            yield line_no, ImportRowError("Objet JSON attendu")
+            continue
+        yield line_no, row
+
+
+# =========================================================
+# VALIDATION D'UNE LIGNE
+# =========================================================
+def _is_empty(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _category_id(value):
+    # Accepte l'id ou le slug de la catégorie
+    value = str(value).strip()
+    category = category_registry.get(value)
+    if category is None:
+        category_id = category_registry.id_for_slug(value)
+        category = category_registry.get(category_id) if category_id else None
+    if category is None:
+        raise ImportRowError(f"Catégorie inconnue : {value}")
+    return category['id']
+
+
+def _convert(name, value):
+    if name == 'price':
+        try:
+            value = Decimal(str(value).strip().replace(',', '.'))
+            # "NaN" / "Infinity" sont des Decimal valides : pas des prix
+            if not value.is_finite():
+                raise ImportRowError(f"Prix invalide : {value}")
+        except InvalidOperation:
+            raise ImportRowError(f"Prix invalide : {value}")
+        if value < 0:
+            raise ImportRowError("Le prix doit être positif")
+    elif name == 'stock':
+        try:
+            value = int(str(value).strip())
+        except ValueError:
+            raise ImportRowError(f"Stock invalide : {value}")
+    elif name == 'is_active':
+        value = value is True or str(value).strip() in TRUE_VALUES + ('yes', 'oui')
+    elif name == 'category':
+        return Product._fields['category'].to_mongo(_category_id(value))
+    else:
+        value = str(value).strip()
+
+    field = Product._fields[name]
+    try:
+        field.validate(value)
+    except ValidationError as e:
+        raise ImportRowError(f"{name} : {e.message}")
+    return field.to_mongo(value)
+
+
+def clean_row(row):
+    """
+    Ligne brute -> (slug, champs MongoDB à mettre à jour).
+    Seules les colonnes renseignées sont mises à jour.
+    """
+    fields = {}
+    for name in COLUMNS:
+        if name == 'slug' or name not in row or _is_empty(row[name]):
+            continue
+        fields[name] = _convert(name, row[name])
+
+    slug = row.get('slug')
+    slug = slugify(str(slug)) if not _is_empty(slug) else slugify(fields.get('title', ''))
+    if not slug:
+        raise ImportRowError("slug ou title requis")
+    return slug, fields
+
+
+# =========================================================
+# IMPORT
+# =========================================================
+def _flush(batch, report):
+    """Écrit un lot [(ligne, slug, champs)] en un seul bulk_write"""
+    slugs = [slug for _, slug, _ in batch]
+    existing = set(Product.objects(slug__in=slugs).scalar('slug'))
+
+    operations, lines = [], []
+    for line_no, slug, fields in batch:
+        if slug not in existing and ('title' not in fields or 'price' not in fields):
+            report['errors'].append({'line': line_no, 'slug': slug, 'error': "title et price requis pour un nouveau produit"})
+            continue
+        operations.append(UpdateOne(
+            {'slug': slug},
+            {
+                '$set': fields,
+                # Valeurs par défaut d'un nouveau produit (cf. models.Product)
+                '$setOnInsert': {
+                    key: value for key, value in (
+                        ('created_at', datetime.utcnow()),
+                        ('stock', 0),
+                        ('is_active', True),
+                    ) if key not in fields
+                },
+            },
+            upsert=True
+        ))
+        lines.append((line_no, slug, slug not in existing))
+        existing.add(slug)  # slug répété dans le même lot : mise à jour
+
+    if not operations:
+        return
+
+    failed = set()
+    try:
+        Product._get_collection().bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        for err in e.details.get('writeErrors', []):
+            line_no, slug, _ = lines[err['index']]
+            failed.add(err['index'])
+            report['errors'].append({'line': line_no, 'slug': slug, 'error': err.get('errmsg', 'Erreur MongoDB')})
+
+    for index, (_, _, created) in enumerate(lines):
+        if index not in failed:
+            report['created' if created else 'updated'] += 1
+
+
+def import_products(upload, fmt):
+    """
+    Importe le fichier `upload` (CSV ou JSONL).
+    Retourne {"rows", "created", "updated", "errors": [{"line", "slug", "error"}]}.
+    """
+    report = {'rows': 0, 'created': 0, 'updated': 0, 'errors': []}
+    batch, batch_slugs = [], set()
+    for line_no, row in iter_rows(upload, fmt):
+        report['rows'] += 1
+        if isinstance(row, ImportRowError):
+            report['errors'].append({'line': line_no, 'slug': None, 'error': str(row)})
+            continue
+        try:
+            slug, fields = clean_row(row)
+        except ImportRowError as e:
+            report['errors'].append({'line': line_no, 'slug': row.get('slug') or None, 'error': str(e)})
+            continue
+
+        # Un bulk_write non ordonné n'applique pas deux lignes du même
+        # slug dans l'ordre du fichier : le doublon part dans le lot suivant
+        if slug in batch_slugs or len(batch) >= BATCH_SIZE:
+            _flush(batch, report)
+            batch, batch_slugs = [], set()
+        batch.append((line_no, slug, fields))
+        batch_slugs.add(slug)
+
+    if batch:
+        _flush(batch, report)
+
+    # Les bulk_write ne passent pas par Product.save() : une seule invalidation
+    if report['created'] or report['updated']:
+        invalidate_catalog()
+        search_index.mark_stale()
+
+    report['errors'].sort(key=lambda err: err['line'])
+    return report
+
+
+# =========================================================
+# EXPORT
+# =========================================================
+def _export_row(doc):
+    category = category_registry.get(doc.get('category'))
+    price = doc.get('price')
+    return {
+        'slug': doc.get('slug'),
+        'title': doc.get('title'),
+        'price': str(price) if price is not None else None,
+        'stock': doc.get('stock', 0),
+        'category': category['slug'] if category else None,
+        'description': doc.get('description') or '',
+        'image': doc.get('image') or doc.get('image_path') or '',
+        'source_url': doc.get('source_url') or '',
+        'is_active': doc.get('is_active', True),
+    }
+
+
+def export_products(fmt):
+    """Générateur de lignes (str) du catalogue complet"""
+    cursor = (
+        Product._get_collection()
+        .find({}, {name: 1 for name in COLUMNS + ('image_path',)})
+        .sort('_id', 1)
+        .batch_size(BATCH_SIZE)
+    )
+
+    if fmt == 'jsonl':
+        for doc in cursor:
+            yield json.dumps(_export_row(doc), ensure_ascii=False) + '\n'
+        return
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUMNS)
+    writer.writeheader()
+    for doc in cursor:
+        writer.writerow(_export_row(doc))
+        # On vide le tampon régulièrement pour envoyer par morceaux
+        if buffer.tell() > 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+# =========================================================
+# MISE À JOUR D'INVENTAIRE (prix / stock / actif)
+# =========================================================
+def _inventory_update(item):
+    """{"price"?, "stock"?, "stock_delta"?, "is_active"?} -> opérations MongoDB"""
+    if 'stock' in item and 'stock_delta' in item:
+        raise ImportRowError("stock et stock_delta sont exclusifs")
+
+    update = {}
+    fields = {
+        name: _convert(name, item[name])
+        for name in ('price', 'stock', 'is_active')
+        if name in item and not _is_empty(item[name])
+    }
+    if fields:
+        update['$set'] = fields
+    if not _is_empty(item.get('stock_delta')):
+        update['$inc'] = {'stock': _convert('stock', item['stock_delta'])}
+    if not update:
+        raise ImportRowError("Rien à mettre à jour (price, stock, stock_delta ou is_active)")
+    return update
+
+
+def _resolve_products(items):
+    """Ids et slugs reçus -> ObjectId existants, en une seule requête"""
+    ids, slugs = set(), set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        if item.get('id') and ObjectId.is_valid(str(item['id'])):
+            ids.add(ObjectId(str(item['id'])))
+        elif item.get('slug'):
+            slugs.add(str(item['slug']))
+
+    by_id, by_slug = set(), {}
+    found = Product._get_collection().find(
+        {'$or': [{'_id': {'$in': list(ids)}}, {'slug': {'$in': list(slugs)}}]},
+        {'slug': 1}
+    )
+    for doc in found:
+        by_id.add(doc['_id'])
+        by_slug[doc.get('slug')] = doc['_id']
+    return by_id, by_slug
+
+
+def apply_inventory_updates(items):
+    """
+    Applique une liste [{id|slug, price?, stock?, stock_delta?, is_active?}].
+    Retourne {"updated", "errors", "results": [{"index", "id", "status", "error"?}]}.
+    """
+    by_id, by_slug = _resolve_products(items)
+    results, operations, positions, guarded = [], [], [], []
+
+    for index, item in enumerate(items):
+        result = {'index': index, 'id': None}
+        results.append(result)
+        try:
+            if not isinstance(item, dict):
+                raise ImportRowError("Objet attendu")
+
+            if item.get('id'):
+                raw_id = str(item['id'])
+                product_id = ObjectId(raw_id) if ObjectId.is_valid(raw_id) else None
+                product_id = product_id if product_id in by_id else None
+            else:
+                product_id = by_slug.get(str(item.get('slug') or ''))
+            if product_id is None:
+                result.update(status='not_found', error="Produit introuvable (id ou slug)")
+                continue
+
+            result['id'] = str(product_id)
+            update = _inventory_update(item)
+            delta = update.get('$inc', {}).get('stock', 0)
+            if delta < 0:
+                # Jamais de stock négatif : appliqué seul, si le stock suffit
+                guarded.append((result, {'_id': product_id, 'stock': {'$gte': -delta}}, update))
+                continue
+            operations.append(UpdateOne({'_id': product_id}, update))
+            positions.append(result)
+        except ImportRowError as e:
+            result.update(status='error', error=str(e))
+
+    collection = Product._get_collection()
+    for result, query, update in guarded:
+        if collection.update_one(query, update).matched_count:
+            result['status'] = 'updated'
+        else:
+            result.update(status='error', error="Stock insuffisant pour stock_delta")
+
+    for start in range(0, len(operations), BATCH_SIZE):
+        chunk = operations[start:start + BATCH_SIZE]
+        failed = {}
+        try:
+            collection.bulk_write(chunk, ordered=False)
+        except BulkWriteError as e:
+            failed = {err['index']: err.get('errmsg', 'Erreur MongoDB') for err in e.details.get('writeErrors', [])}
+        for offset, result in enumerate(positions[start:start + BATCH_SIZE]):
+            if offset in failed:
+                result.update(status='error', error=failed[offset])
+            else:
+                result['status'] = 'updated'
+
+    updated = sum(1 for result in results if result['status'] == 'updated')
+    if updated:
+        # Une seule invalidation pour tout l'appel
+        invalidate_catalog()
+        if any(isinstance(item, dict) and 'is_active' in item for item in items):
+            # L'index de recherche ne contient que les produits actifs
+            search_index.mark_stale()
+
+    return {
+        'updated': updated,
+        'errors': len(results) - updated,
+        'results': results,
+    }
+
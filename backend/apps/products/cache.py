@@ -0,0 +1,137 @@
+# backend/apps/products/cache.py
+"""
+Cache des réponses publiques du catalogue (catégories, liste, détail).
+
+- La réponse JSON déjà rendue est stockée dans le cache Django, sous une clé
+  construite à partir du chemin + paramètres normalisés + "version" du catalogue.
+- Toute écriture sur un produit ou une catégorie change la version
+  (invalidate_catalog) : les anciennes entrées ne sont plus jamais lues.
+  L'appel est fait une fois par opération (vue admin, import en masse,
+  réservation de stock...), pas à chaque Product.save() : un lot de N
+  écritures coûte un seul findAndModify.
+- ETag / Last-Modified sont renvoyés, et If-None-Match / If-Modified-Since
+  reçoivent un 304 sans corps.
+
+La version est un document MongoDB (collection catalog_version : compteur
++ date de la dernière modification), partagé par tous les workers et
+conservé après un redémarrage à froid : ETag et Last-Modified sont les
+mêmes quel que soit le process qui répond. Chaque process le relit au
+plus toutes les CATALOG_CACHE['VERSION_TTL'] secondes.
+"""
+import calendar
+import hashlib
+import json
+from datetime import datetime
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from mongoengine.connection import get_db
+from pymongo import ReturnDocument
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.pagination import NEXT_CURSOR_HEADER
+
+VERSION_KEY = 'catalog:version'
+# En-têtes de la vue conservés dans le cache avec le corps
+KEPT_HEADERS = (NEXT_CURSOR_HEADER,)
+VERSION_COLLECTION = 'catalog_version'
+VERSION_ID = 'catalog'
+
+
+def _config():
+    return getattr(settings, 'CATALOG_CACHE', {})
+
+
+def _cache():
+    return caches[_config().get('ALIAS', 'default')]
+
+
+def _state(doc):
+    # Timestamp entier : Last-Modified n'a qu'une précision à la seconde
+    return doc['version'], calendar.timegm(doc['updated_at'].utctimetuple())
+
+
+def catalog_version():
+    """(numéro de version, timestamp de la dernière modification du catalogue)"""
+    cache = _cache()
+    state = cache.get(VERSION_KEY)
+    if state is None:
+        # Premier accès : le document est créé s'il n'existe pas encore
+        doc = get_db()[VERSION_COLLECTION].find_one_and_update(
+            {'_id': VERSION_ID},
+            {'$setOnInsert': {'version': 1, 'updated_at': datetime.utcnow()}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        state = _state(doc)
+        cache.set(VERSION_KEY, state, _config().get('VERSION_TTL', 5))
+    return state
+
+
+def invalidate_catalog():
+    """À appeler une fois après chaque opération qui écrit des Product / Category"""
+    doc = get_db()[VERSION_COLLECTION].find_one_and_update(
+        {'_id': VERSION_ID},
+        {'$inc': {'version': 1}, '$set': {'updated_at': datetime.utcnow()}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    _cache().set(VERSION_KEY, _state(doc), _config().get('VERSION_TTL', 5))
+
+
+def _response_key(request, version):
+    params = sorted((k, v) for k in request.query_params for v in request.query_params.getlist(k))
+    raw = f"{request.get_host()}{request.path}?{urlencode(params)}"
+    return f"catalog:{version}:{hashlib.md5(raw.encode('utf-8')).hexdigest()}"
+
+
+def _not_modified(request, etag, modified):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+    since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return since is not None and modified <= since
+
+
+def _with_headers(response, etag, modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(modified)
+    response['Cache-Control'] = f"public, max-age={_config().get('MAX_AGE', 0)}, must-revalidate"
+    return response
+
+
+def cached_catalog_response(view_method):
+    """
+    Décorateur pour les méthodes get() des vues publiques du catalogue.
+    Seules les réponses 200 sont mises en cache.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        version, modified = catalog_version()
+        key = _response_key(request, version)
+        cache = _cache()
+
+        entry = cache.get(key)
+        if entry is None:
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            body = json.dumps(response.data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            # En-têtes propres à la réponse (ex : curseur suivant), rejoués tels quels
+            extra = {name: response[name] for name in KEPT_HEADERS if response.has_header(name)}
+            entry = (body, quote_etag(hashlib.md5(body).hexdigest()), extra)
+            cache.set(key, entry, _config().get('TTL', 60))
+
+        body, etag, extra = entry
+        if _not_modified(request, etag, modified):
+            return _with_headers(HttpResponseNotModified(), etag, modified)
+        response = HttpResponse(body, content_type='application/json')
+        for name, value in extra.items():
+            response[name] = value
+        return _with_headers(response, etag, modified)
+
+    return wrapper
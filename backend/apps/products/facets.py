@@ -0,0 +1,98 @@
+# backend/apps/products/facets.py
+"""
+Filtres à facettes du catalogue public.
+
+Les filtres sont exprimés en conditions MongoDB brutes pour servir à la fois
+au QuerySet de la liste et au pipeline d'agrégation des compteurs.
+Chaque facette est comptée avec tous les filtres SAUF le sien (le client
+voit combien de produits il obtiendrait en changeant ce critère).
+"""
+from decimal import Decimal, InvalidOperation
+
+from .models import Product
+from .registry import category_registry
+
+# ?sort=... -> (champ, décroissant ?)
+SORTS = {
+    'newest': ('created_at', True),
+    'price': ('price', False),
+    '-price': ('price', True),
+}
+
+TRUE_VALUES = ('1', 'true', 'True')
+
+
+def _price(value, name):
+    try:
+        return float(Decimal(value))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"{name} doit être un nombre")
+
+
+def parse_filters(params, category_id=None):
+    """
+    Paramètres de requête -> {nom de facette: condition Mongo}.
+    Lève ValueError si une valeur est invalide.
+    """
+    filters = {}
+    if category_id is not None:
+        filters['category'] = {'category': category_id}
+
+    bounds = {}
+    if params.get('min_price'):
+        bounds['$gte'] = _price(params['min_price'], 'min_price')
+    if params.get('max_price'):
+        bounds['$lte'] = _price(params['max_price'], 'max_price')
+    if bounds:
+        filters['price'] = {'price': bounds}
+
+    if params.get('in_stock') in TRUE_VALUES:
+        filters['stock'] = {'stock': {'$gt': 0}}
+
+    return filters
+
+
+def merge(*conditions):
+    match = {}
+    for condition in conditions:
+        match.update(condition)
+    return match
+
+
+def catalog_facets(base_match, filters):
+    """
+    Compteurs des facettes en UNE agrégation :
+    {"total", "in_stock", "price": {"min", "max"}, "categories": [...]}
+    """
+    def match_except(name):
+        return {'$match': merge(*(c for n, c in filters.items() if n != name))}
+
+    pipeline = [
+        {'$match': base_match},
+        {'$facet': {
+            'total': [match_except(None), {'$count': 'n'}],
+            'categories': [match_except('category'), {'$group': {'_id': '$category', 'count': {'$sum': 1}}}],
+            'price': [match_except('price'), {'$group': {'_id': None, 'min': {'$min': '$price'}, 'max': {'$max': '$price'}}}],
+            'in_stock': [match_except('stock'), {'$match': {'stock': {'$gt': 0}}}, {'$count': 'n'}],
+        }},
+    ]
+    result = next(iter(Product.objects.aggregate(pipeline)), {})
+
+    def count(name):
+        rows = result.get(name)
+        return rows[0]['n'] if rows else 0
+
+    counts = {row['_id']: row['count'] for row in result.get('categories', []) if row['_id'] is not None}
+    categories = [
+        dict(category, count=count)
+        for category_id, count in counts.items()
+        if (category := category_registry.get(category_id)) is not None
+    ]
+    price = result['price'][0] if result.get('price') else {}
+
+    return {
+        "total": count('total'),
+        "in_stock": count('in_stock'),
+        "price": {"min": price.get('min'), "max": price.get('max')},
+        "categories": sorted(categories, key=lambda c: -c['count']),
+    }
@@ -0,0 +1,96 @@
+# backend/apps/products/image_processing.py
+"""
+Réduction des photos produits avant envoi au stockage.
+
+Les photos arrivent souvent en pleine résolution d'appareil (plusieurs Mo).
+On les redimensionne (côté max IMAGE_PROCESSING['MAX_SIZE']), on applique
+l'orientation EXIF puis on retire toutes les métadonnées, et on réencode
+en WebP (ou JPEG) à la qualité cible.
+
+Le traitement tourne côté envoi (uploads._push), pas dans la vue. Pour
+limiter la mémoire :
+- l'image est lue depuis le fichier du spool (pas depuis la requête) ;
+- les JPEG sont décodés directement à taille réduite (Image.draft) ;
+- les autres formats sont décodés en entier : au-delà de
+  IMAGE_PROCESSING['MAX_PIXELS'] on refuse de les décoder (image géante ou
+  "bombe de décompression"), en lisant seulement l'en-tête ;
+- la réduction se fait par paliers (thumbnail avec reducing_gap).
+Si Pillow n'est pas installé ou si le fichier n'est pas une image lisible
+(ou trop grande), le fichier d'origine est envoyé tel quel.
+"""
+import os
+
+from django.conf import settings
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow optionnel : pas de traitement
+    Image = None
+
+# Format Pillow -> extension du fichier produit
+EXTENSIONS = {'WEBP': '.webp', 'JPEG': '.jpg'}
+
+
+def _config():
+    return getattr(settings, 'IMAGE_PROCESSING', {})
+
+
+def _prepare(img, max_size, max_pixels):
+    # Décodage JPEG à l'échelle la plus proche (1/2, 1/4, 1/8) : moins de RAM
+    img.draft('RGB', (max_size, max_size))
+    # Taille réellement décodée (après draft), lue dans l'en-tête : rien
+    # n'est encore chargé en mémoire
+    width, height = img.size
+    if width * height > max_pixels:
+        raise ValueError(f"image trop grande ({width}x{height} px)")
+    # Réduction grossière (entière) puis LANCZOS sur une image déjà petite
+    img.thumbnail((max_size, max_size), Image.LANCZOS, reducing_gap=3.0)
+    # Orientation EXIF (photos de téléphone) appliquée à l'image réduite,
+    # avant de supprimer les métadonnées
+    return ImageOps.exif_transpose(img)
+
+
+def optimize_image(src_path, dst_base):
+    """
+    Redimensionne et réencode `src_path` vers `dst_base` + extension.
+    Retourne l'extension du fichier écrit, ou None si rien n'a été fait
+    (le fichier source doit alors être utilisé tel quel).
+    """
+    config = _config()
+    if Image is None or not config.get('ENABLED', True):
+        return None
+
+    max_size = config.get('MAX_SIZE', 1600)
+    max_pixels = config.get('MAX_PIXELS', 40_000_000)
+    quality = config.get('QUALITY', 82)
+    fmt = config.get('FORMAT', 'WEBP').upper()
+
+    try:
+        with Image.open(src_path) as img:
+            # Les GIF animés perdraient leur animation : on ne touche à rien
+            if getattr(img, 'is_animated', False):
+                return None
+
+            img = _prepare(img, max_size, max_pixels)
+            has_alpha = img.mode in ('RGBA', 'LA') or 'transparency' in img.info
+            if fmt == 'JPEG' and has_alpha:
+                # Le JPEG ne gère pas la transparence : on garde le WebP
+                fmt = 'WEBP'
+            img = img.convert('RGBA' if has_alpha else 'RGB')
+
+            ext = EXTENSIONS.get(fmt, '.webp')
+            # Aucune métadonnée n'est recopiée (pas d'exif=..., pas d'icc)
+            options = {'quality': quality}
+            if fmt == 'JPEG':
+                options.update(optimize=True, progressive=True)
+            else:
+                options['method'] = 4
+            img.save(dst_base + ext, 'JPEG' if fmt == 'JPEG' else 'WEBP', **options)
+            return ext
+    except Exception as e:
+        print(f"⚠️ Image non optimisée ({os.path.basename(src_path)}) : {e}")
+        try:
+            os.remove(dst_base + EXTENSIONS.get(fmt, '.webp'))
+        except OSError:
+            pass
+        return None
@@ -0,0 +1,94 @@
+# backend/apps/products/images.py
+"""
+Construction des URLs publiques des images produits (Cloudinary ou local).
+Partagé par ProductSerializer et OrderSerializer.
+
+Un chemin d'image donne toujours la même URL : les résultats sont mémoïsés
+par chemin (plus d'appel à default_storage.url() par produit et par requête).
+Pour Cloudinary, des variantes redimensionnées (miniature, carte, WebP...)
+sont calculées une fois à partir du même public_id.
+"""
+from functools import lru_cache
+
+import cloudinary
+from cloudinary_storage.storage import MediaCloudinaryStorage
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+# Transformations Cloudinary des variantes (appliquées à la volée par le CDN)
+IMAGE_VARIANTS = {
+    'thumb': {'width': 200, 'height': 200, 'crop': 'fill', 'quality': 'auto', 'fetch_format': 'auto'},
+    'card': {'width': 480, 'crop': 'limit', 'quality': 'auto', 'fetch_format': 'auto'},
+    'full': {'width': 1600, 'crop': 'limit', 'quality': 'auto', 'fetch_format': 'auto'},
+    'webp': {'width': 1600, 'crop': 'limit', 'quality': 'auto', 'fetch_format': 'webp'},
+}
+
+# Nombre de chemins d'images gardés en mémoire
+URL_CACHE_SIZE = 4096
+
+
+def image_path_of(obj):
+    """Chemin stocké de l'image d'un produit (nouveau champ puis ancien)"""
+    img_field = getattr(obj, 'image', None) or getattr(obj, 'image_path', None)
+    return str(img_field) if img_field else ''
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def _storage_url(image_path):
+    # 1. Si c'est déjà une URL complète (ex: anciennes images migrées), on renvoie direct
+    if image_path.startswith('http'):
+        return image_path
+
+    # 2. LA MAGIE CLOUDINARY / LOCAL
+    # default_storage.url() va demander au système de stockage actuel (Disque ou Cloud)
+    # quelle est la vraie URL publique du fichier.
+    try:
+        return default_storage.url(image_path)
+    except Exception:
+        # Fallback de sécurité si le storage échoue
+        return f"{settings.MEDIA_URL}{image_path}"
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def _variant_urls(image_path):
+    if image_path.startswith('http') or not isinstance(default_storage, MediaCloudinaryStorage):
+        # Image externe ou stockage local : pas de transformation possible
+        url = _storage_url(image_path)
+        return {name: url for name in IMAGE_VARIANTS}
+
+    # Même public_id que default_storage.url(), avec une transformation en plus
+    try:
+        resource = cloudinary.CloudinaryResource(
+            default_storage._prepend_prefix(image_path),
+            default_resource_type='image'
+        )
+        return {name: resource.build_url(**options) for name, options in IMAGE_VARIANTS.items()}
+    except Exception as e:
+        print(f"Erreur variantes Cloudinary ({image_path}): {e}")
+        url = _storage_url(image_path)
+        return {name: url for name in IMAGE_VARIANTS}
+
+
+def _absolute(url, request):
+    # Pour le Local uniquement :
+    # default_storage renvoie souvent juste "/media/..." en local.
+    # On ajoute "http://localhost:8000" devant pour que React soit content.
+    if request and not url.startswith('http'):
+        return request.build_absolute_uri(url)
+    return url
+
+
+def image_url(image_path, request=None, variant=None):
+    """'products/x.jpg' -> URL publique (ou None si pas d'image)"""
+    if not image_path:
+        return None
+    image_path = str(image_path)
+    url = _variant_urls(image_path)[variant] if variant in IMAGE_VARIANTS else _storage_url(image_path)
+    return _absolute(url, request)
+
+
+def image_variants(image_path, request=None):
+    """Toutes les variantes {"thumb", "card", "full", "webp"} (ou None)"""
+    if not image_path:
+        return None
+    return {name: _absolute(url, request) for name, url in _variant_urls(str(image_path)).items()}
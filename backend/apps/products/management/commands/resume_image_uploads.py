@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.products.uploads import resume_pending_uploads
+
+
+class Command(BaseCommand):
+    help = "Relance les envois d'images interrompus encore présents dans le spool (ex : après un redémarrage)"
+
+    def handle(self, *args, **options):
+        count = resume_pending_uploads()
+        self.stdout.write(self.style.SUCCESS(f"✅ {count} envois d'images relancés"))
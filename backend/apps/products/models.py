@@ -3,6 +3,9 @@ from datetime import datetime
 # 👇 1. IMPORT NÉCESSAIRE pour transformer "Canne à pêche" en "canne-a-peche"
 from django.utils.text import slugify 
 
+from .registry import category_registry
+from .search import search_index
+
 class Category(me.Document):
     name = me.StringField(required=True, unique=True)
     slug = me.StringField(required=True, unique=True)
@@ -10,6 +13,21 @@ class Category(me.Document):
     def __str__(self):
         return self.name
 
+    # Toute écriture invalide le registre des catégories (registry.py) et
+    # l'index de recherche (search.py). Le cache des réponses (cache.py) est
+    # invalidé par l'appelant, une fois par opération : invalidate_catalog()
+    def save(self, *args, **kwargs):
+        result = super(Category, self).save(*args, **kwargs)
+        category_registry.invalidate()
+        search_index.mark_stale()
+        return result
+
+    def delete(self, *args, **kwargs):
+        result = super(Category, self).delete(*args, **kwargs)
+        category_registry.invalidate()
+        search_index.mark_stale()
+        return result
+
 class Product(me.Document):
     title = me.StringField(required=True)
     
@@ -30,6 +48,10 @@ class Product(me.Document):
     # GESTION IMAGES
     image_path = me.StringField() # Pour les anciens produits
     image = me.StringField()      # Pour les nouveaux produits (Cloudinary)
+    # Envoi vers le stockage (voir uploads.py) : "pending" / "uploading" tant que l'upload tourne
+    image_status = me.StringField(choices=('ready', 'pending', 'uploading', 'failed'))
+    image_pending = me.StringField()  # Chemin cible de l'upload en cours
+    image_lock_until = me.DateTimeField()  # Fin de la réservation de l'envoi en cours
     
     # Pour le suivi
     source_url = me.StringField()
@@ -37,7 +59,14 @@ class Product(me.Document):
     created_at = me.DateTimeField(default=datetime.utcnow)
 
     meta = {
-        'indexes': ['slug', 'category', 'price']
+        'indexes': [
+            'slug', 'category', 'price',
+            # Liste publique : filtres + tri + pagination par curseur (champ de tri, id)
+            ('is_active', '-created_at', '-id'),
+            ('is_active', 'category', '-created_at', '-id'),
+            ('is_active', 'price', 'id'),
+            ('is_active', 'category', 'price', 'id'),
+        ]
     }
 
     def __str__(self):
@@ -50,4 +79,13 @@ class Product(me.Document):
             self.slug = slugify(self.title)
         
         # On appelle la méthode de sauvegarde normale de MongoEngine
-        return super(Product, self).save(*args, **kwargs)
\ No newline at end of file
+        # (cache des réponses : invalidate_catalog() par l'appelant, voir Category)
+        result = super(Product, self).save(*args, **kwargs)
+        search_index.update_product(self)
+        return result
+
+    def delete(self, *args, **kwargs):
+        product_id = self.id
+        result = super(Product, self).delete(*args, **kwargs)
+        search_index.remove_product(product_id)
+        return result
\ No newline at end of file
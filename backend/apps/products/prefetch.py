@@ -0,0 +1,35 @@
+# backend/apps/products/prefetch.py
+"""
+Préchargement groupé des références des produits.
+
+Lire `product.category.name` déclenche une requête MongoDB par produit
+(déréférencement du ReferenceField). Ici on collecte les ids d'une page
+de produits et on les résout depuis le registre en mémoire (registry.py) ;
+le serializer lit ensuite le dictionnaire passé dans son contexte.
+"""
+from .registry import category_registry
+
+
+def category_ref_id(product):
+    """Id de la catégorie d'un produit, SANS déréférencer le ReferenceField"""
+    ref = product._data.get('category')
+    if ref is None:
+        return None
+    # DBRef ou Document -> .id ; ObjectId brut -> lui-même
+    return getattr(ref, 'id', ref)
+
+
+def prefetch_categories(products):
+    """
+    Résout les catégories d'une liste de produits, sans requête par produit.
+    Retourne {ObjectId: {"id", "name", "slug"}}.
+    """
+    ids = {category_ref_id(p) for p in products}
+    ids.discard(None)
+
+    categories = {}
+    for category_id in ids:
+        category = category_registry.get(category_id)
+        if category is not None:
+            categories[category_id] = category
+    return categories
@@ -0,0 +1,110 @@
+# backend/apps/products/registry.py
+"""
+Registre des catégories en mémoire (slug -> id, id -> {name, slug}).
+
+Les catégories sont peu nombreuses et rarement modifiées : on les charge
+une fois par process, au premier accès (pas au démarrage : les commandes
+manage.py et les workers qui ne s'en servent pas n'interrogent pas la
+base), et on les sert ensuite sans requête MongoDB. Un seul thread charge,
+les autres attendent le verrou. Rechargement :
+- à chaque Category.save() / delete() dans ce process ;
+- après CATEGORY_REGISTRY_TTL secondes (écritures des autres workers) ;
+- sur un id / slug inconnu, au plus une fois toutes les MISS_RELOAD_INTERVAL s.
+"""
+import threading
+import time
+
+from bson import ObjectId
+from django.conf import settings
+
+# Intervalle minimal entre deux rechargements provoqués par une clé inconnue
+MISS_RELOAD_INTERVAL = 5
+
+
+class CategoryRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_id = {}      # ObjectId -> {"id", "name", "slug"}
+        self._by_slug = {}    # slug -> ObjectId
+        self._loaded_at = None
+
+    def load(self):
+        """Charge toutes les catégories (une requête projetée)"""
+        with self._lock:
+            self._load()
+
+    def _load(self):
+        # Appelé verrou tenu
+        # Import local : models.py importe ce module pour ses hooks save/delete
+        from .models import Category
+
+        by_id, by_slug = {}, {}
+        for doc in Category.objects.only('name', 'slug').as_pymongo():
+            by_id[doc['_id']] = {"id": str(doc['_id']), "name": doc.get('name'), "slug": doc.get('slug')}
+            by_slug[doc.get('slug')] = doc['_id']
+
+        self._by_id, self._by_slug = by_id, by_slug
+        self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def _age(self):
+        return None if self._loaded_at is None else time.monotonic() - self._loaded_at
+
+    def _stale(self, max_age):
+        age = self._age()
+        return age is None or age > max_age
+
+    def _ensure_loaded(self):
+        ttl = getattr(settings, 'CATEGORY_REGISTRY_TTL', 300)
+        if self._stale(ttl):
+            with self._lock:
+                # Un autre thread a pu charger pendant l'attente du verrou
+                if self._stale(ttl):
+                    self._load()
+
+    def _reload_on_miss(self):
+        """Clé inconnue : peut-être créée par un autre worker"""
+        if not self._stale(MISS_RELOAD_INTERVAL):
+            return False
+        with self._lock:
+            if self._stale(MISS_RELOAD_INTERVAL):
+                self._load()
+        return True
+
+    # -----------------------------------------------------------------
+    # LECTURES
+    # -----------------------------------------------------------------
+    def get(self, category_id):
+        """{"id", "name", "slug"} d'une catégorie (id str ou ObjectId), ou None"""
+        if category_id is None:
+            return None
+        if not isinstance(category_id, ObjectId):
+            if not ObjectId.is_valid(category_id):
+                return None
+            category_id = ObjectId(category_id)
+
+        self._ensure_loaded()
+        category = self._by_id.get(category_id)
+        if category is None and self._reload_on_miss():
+            category = self._by_id.get(category_id)
+        return category
+
+    def id_for_slug(self, slug):
+        """ObjectId de la catégorie portant ce slug, ou None"""
+        self._ensure_loaded()
+        category_id = self._by_slug.get(slug)
+        if category_id is None and self._reload_on_miss():
+            category_id = self._by_slug.get(slug)
+        return category_id
+
+    def all(self):
+        """Toutes les catégories, dans l'ordre de la collection"""
+        self._ensure_loaded()
+        return list(self._by_id.values())
+
+
+# Instance unique par process
+category_registry = CategoryRegistry()
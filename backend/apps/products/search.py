@@ -0,0 +1,238 @@
+# backend/apps/products/search.py
+"""
+Index de recherche en mémoire pour le catalogue.
+
+`title__icontains` se traduisait par une regex non ancrée : parcours complet
+de la collection, sans la description ni la catégorie. Ici on maintient un
+index inversé (terme -> {produit: score}) construit depuis Product :
+- textes "repliés" (minuscules, sans accents : "Pêche" == "peche") ;
+- chaque mot de la requête peut être un début de terme ("moul" -> "moulinet") ;
+- pertinence pondérée : titre > catégorie > description.
+
+Le même objet porte l'autocomplétion : un tableau trié de clés repliées
+(titre complet, mots du titre, slug, nom de catégorie) parcouru par préfixe.
+
+L'index est construit au premier usage, mis à jour à chaque Product.save() /
+delete() du process, et reconstruit après SEARCH_INDEX['TTL'] secondes pour
+récupérer les écritures faites par les autres workers.
+"""
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+
+from bson import ObjectId
+from django.conf import settings
+from sortedcontainers import SortedList
+
+# Poids de chaque champ dans le score de pertinence
+FIELD_WEIGHTS = {'title': 3.0, 'category': 2.0, 'description': 1.0}
+# Un terme trouvé par préfixe compte moins qu'un terme exact
+PREFIX_FACTOR = 0.5
+
+# Autocomplétion : rang de chaque type de clé (plus petit = mieux classé)
+SUGGEST_RANKS = {'title': 0, 'word': 1, 'slug': 1, 'category': 2}
+# Nombre maximum de clés parcourues pour une suggestion
+SUGGEST_SCAN_LIMIT = 2000
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def fold(text):
+    """'Moulinet Pêche-Mer' -> 'moulinet peche mer'"""
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(' ', stripped.lower()).strip()
+
+
+def tokenize(text):
+    return fold(text).split()
+
+
+def _config():
+    return getattr(settings, 'SEARCH_INDEX', {})
+
+
+class SearchIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._postings = defaultdict(dict)   # terme -> {product_id: score}
+        self._doc_terms = {}                 # product_id -> termes indexés
+        self._terms = SortedList()           # termes triés (recherche par préfixe)
+        self._category_names = {}            # category_id -> nom
+        self._suggest = SortedList()         # (clé repliée, rang, product_id)
+        self._suggest_entries = {}           # product_id -> clés d'autocomplétion
+        self._info = {}                      # product_id -> (titre, slug)
+        self._built_at = None
+
+    # -----------------------------------------------------------------
+    # CONSTRUCTION
+    # -----------------------------------------------------------------
+    def build(self):
+        """(Re)construit l'index depuis MongoDB : 2 requêtes projetées"""
+        # Import local : models.py importe ce module pour ses hooks save/delete
+        from .models import Product
+        from .registry import category_registry
+
+        categories = {ObjectId(c['id']): c['name'] or '' for c in category_registry.all()}
+        products = Product.objects(is_active=True).only('title', 'slug', 'description', 'category').as_pymongo()
+
+        with self._lock:
+            self._reset()
+            self._category_names = categories
+            for doc in products:
+                self._add(doc['_id'], doc.get('title'), doc.get('slug'), doc.get('description'), doc.get('category'))
+            self._built_at = time.monotonic()
+
+    def _ensure_fresh(self):
+        ttl = _config().get('TTL', 300)
+        if self._built_at is None or time.monotonic() - self._built_at > ttl:
+            self.build()
+
+    def mark_stale(self):
+        """Force une reconstruction à la prochaine recherche"""
+        with self._lock:
+            self._built_at = None
+
+    # -----------------------------------------------------------------
+    # MISES À JOUR INCRÉMENTALES
+    # -----------------------------------------------------------------
+    def _add(self, product_id, title, slug, description, category_id):
+        category_name = self._category_names.get(category_id, '')
+        scores = defaultdict(float)
+        fields = {
+            'title': title,
+            'description': description,
+            'category': category_name,
+        }
+        for field, text in fields.items():
+            for term in tokenize(text):
+                scores[term] += FIELD_WEIGHTS[field]
+
+        for term, score in scores.items():
+            if term not in self._postings:
+                self._terms.add(term)
+            self._postings[term][product_id] = score
+        self._doc_terms[product_id] = set(scores)
+
+        # Clés d'autocomplétion
+        keys = {(fold(title), SUGGEST_RANKS['title'])}
+        keys.update((word, SUGGEST_RANKS['word']) for word in tokenize(title))
+        keys.add((fold(slug), SUGGEST_RANKS['slug']))
+        keys.add((fold(category_name), SUGGEST_RANKS['category']))
+        entries = [(key, rank, product_id) for key, rank in keys if key]
+        for entry in entries:
+            self._suggest.add(entry)
+        self._suggest_entries[product_id] = entries
+        self._info[product_id] = (title or '', slug or '')
+
+    def _remove(self, product_id):
+        for term in self._doc_terms.pop(product_id, ()):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[term]
+                self._terms.remove(term)
+        for entry in self._suggest_entries.pop(product_id, ()):
+            self._suggest.discard(entry)
+        self._info.pop(product_id, None)
+
+    def update_product(self, product):
+        """Appelé après Product.save()"""
+        with self._lock:
+            if self._built_at is None:
+                return  # Pas encore construit : rien à maintenir
+            self._remove(product.id)
+            if not product.is_active:
+                return
+            ref = product._data.get('category')
+            category_id = getattr(ref, 'id', ref)
+            if category_id is not None and category_id not in self._category_names:
+                # Catégorie inconnue de l'index : on reconstruira
+                self._built_at = None
+                return
+            self._add(product.id, product.title, product.slug, product.description, category_id)
+
+    def remove_product(self, product_id):
+        """Appelé après Product.delete()"""
+        with self._lock:
+            if self._built_at is not None:
+                self._remove(product_id)
+
+    # -----------------------------------------------------------------
+    # RECHERCHE
+    # -----------------------------------------------------------------
+    def _matches(self, token):
+        """{product_id: meilleur score} pour un mot de la requête"""
+        best = {}
+        for term in self._terms.irange(minimum=token, maximum=token + '\uffff'):
+            factor = 1.0 if term == token else PREFIX_FACTOR
+            for product_id, score in self._postings[term].items():
+                weighted = score * factor
+                if weighted > best.get(product_id, 0):
+                    best[product_id] = weighted
+        return best
+
+    def search(self, query, limit=None):
+        """
+        Ids des produits actifs contenant TOUS les mots de la requête,
+        du plus pertinent au moins pertinent.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        limit = limit or _config().get('MAX_RESULTS', 500)
+
+        with self._lock:
+            self._ensure_fresh()
+            scores = None
+            for token in sorted(set(tokens), key=len, reverse=True):
+                matches = self._matches(token)
+                if scores is None:
+                    scores = matches
+                else:
+                    scores = {pid: s + matches[pid] for pid, s in scores.items() if pid in matches}
+                if not scores:
+                    return []
+
+        # Égalité de score : le plus récent d'abord (ObjectId croissant dans le temps)
+        ranked = sorted(scores.items(), key=lambda item: (item[1], item[0]), reverse=True)
+        return [product_id for product_id, _ in ranked[:limit]]
+
+    def suggest(self, query, limit=8):
+        """
+        Autocomplétion : [{"id", "title", "slug"}] dont une clé commence par
+        la requête repliée. Titre complet > mot du titre / slug > catégorie.
+        """
+        prefix = fold(query)
+        if not prefix:
+            return []
+
+        with self._lock:
+            self._ensure_fresh()
+            best = {}
+            entries = self._suggest.irange((prefix,), (prefix + '\uffff',))
+            for scanned, (key, rank, product_id) in enumerate(entries):
+                if scanned >= SUGGEST_SCAN_LIMIT:
+                    break
+                if rank < best.get(product_id, len(SUGGEST_RANKS)):
+                    best[product_id] = rank
+            info = {product_id: self._info[product_id] for product_id in best}
+
+        ranked = sorted(best, key=lambda product_id: (best[product_id], info[product_id][0].lower()))
+        return [
+            {"id": str(product_id), "title": info[product_id][0], "slug": info[product_id][1]}
+            for product_id in ranked[:limit]
+        ]
+
+
+# Instance unique par process
+search_index = SearchIndex()
@@ -1,9 +1,10 @@
 # backend/apps/products/serializers.py
 
 from rest_framework import serializers
-from django.conf import settings
-# 👇 IMPORT INDISPENSABLE POUR CLOUDINARY 👇
-from django.core.files.storage import default_storage 
+
+from .images import image_path_of, image_url, image_variants
+from .prefetch import category_ref_id
+from .registry import category_registry
 
 class CategorySerializer(serializers.Serializer):
     id = serializers.CharField(read_only=True)
@@ -22,8 +23,57 @@ class ProductSerializer(serializers.Serializer):
 
     category = serializers.SerializerMethodField()
     image = serializers.SerializerMethodField()
+    # Variantes redimensionnées : {"thumb", "card", "full", "webp"}
+    images = serializers.SerializerMethodField()
+    # "pending" tant que l'image est en cours d'envoi (voir uploads.py)
+    image_status = serializers.CharField(read_only=True, default=None)
+
+    # Champ exposé -> champs MongoDB nécessaires (pour QuerySet.only())
+    PROJECTION = {
+        'id': ('id',),
+        'title': ('title',),
+        'slug': ('slug',),
+        'price': ('price',),
+        'description': ('description',),
+        'stock': ('stock',),
+        'category': ('category',),
+        'image': ('image', 'image_path'),
+        'images': ('image', 'image_path'),
+        'image_status': ('image_status',),
+    }
+
+    def __init__(self, *args, **kwargs):
+        # fields=[...] : on ne garde que les colonnes demandées par le client
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def parse_fields(cls, raw):
+        """'title,price' -> ['title', 'price'] (les noms inconnus sont ignorés)"""
+        if not raw:
+            return None
+        fields = [f.strip() for f in raw.split(',') if f.strip() in cls.PROJECTION]
+        return fields or None
+
+    @classmethod
+    def projection(cls, fields):
+        """Champs MongoDB à charger pour sérialiser `fields`"""
+        return sorted({db_field for f in fields for db_field in cls.PROJECTION[f]})
 
     def get_category(self, obj):
+        # Liste : catégories préchargées par la vue (voir prefetch.py)
+        categories = self.context.get('categories')
+        if categories is not None:
+            return categories.get(category_ref_id(obj))
+
+        # Détail : registre en mémoire, sinon déréférencement classique
+        category = category_registry.get(category_ref_id(obj))
+        if category is not None:
+            return category
+
         if obj.category:
             return {
                 "id": str(obj.category.id),
@@ -33,33 +83,13 @@ class ProductSerializer(serializers.Serializer):
         return None
 
     def get_image(self, obj):
-        request = self.context.get('request')
-        
         # On récupère le chemin de l'image (ex: "products/mon_image.jpg")
-        img_field = getattr(obj, 'image', None) or getattr(obj, 'image_path', None)
-        
-        if not img_field:
-            return None
-            
-        image_path = str(img_field)
-
-        # 1. Si c'est déjà une URL complète (ex: anciennes images migrées), on renvoie direct
-        if image_path.startswith('http'):
-            return image_path
-
-        # 2. LA MAGIE CLOUDINARY / LOCAL
-        # default_storage.url() va demander au système de stockage actuel (Disque ou Cloud)
-        # quelle est la vraie URL publique du fichier.
-        try:
-            url = default_storage.url(image_path)
-        except Exception:
-            # Fallback de sécurité si le storage échoue
-            url = f"{settings.MEDIA_URL}{image_path}"
-
-        # 3. Pour le Local uniquement :
-        # default_storage renvoie souvent juste "/media/..." en local.
-        # On ajoute "http://localhost:8000" devant pour que React soit content.
-        if request and not url.startswith('http'):
-            return request.build_absolute_uri(url)
+        # context['image_variant'] (ex: "card") : les listes servent une image réduite
+        return image_url(
+            image_path_of(obj),
+            self.context.get('request'),
+            variant=self.context.get('image_variant')
+        )
 
-        return url
\ No newline at end of file
+    def get_images(self, obj):
+        return image_variants(image_path_of(obj), self.context.get('request'))
@@ -0,0 +1,72 @@
+# backend/apps/products/stock.py
+"""
+Réservation (décrément) atomique du stock.
+
+Chaque ligne est un `$inc` conditionnel (`stock >= quantité`) via
+find_one_and_update : pas de lecture préalable, pas de sauvegarde du
+document complet, et deux validations simultanées ne peuvent plus
+s'écraser mutuellement. Le résultat de chaque ligne est celui de SA
+propre opération (document renvoyé ou None), sans état partagé.
+
+La réservation est "tout ou rien" : si une ligne manque de stock, les
+lignes déjà décrémentées sont recréditées et la commande n'est pas
+validée. Un produit supprimé entre-temps est ignoré (rien à décrémenter).
+"""
+from pymongo import UpdateOne
+
+from .cache import invalidate_catalog
+from .models import Product
+
+
+def reserve_stock(lines):
+    """
+    lines : itérable de (product_id, quantité).
+    Décrémente le stock de chaque produit si, et seulement si, il est
+    suffisant pour TOUTES les lignes.
+    Retourne les lignes refusées : [{"product_id", "quantity", "available"}]
+    (liste vide : tout le stock a été réservé).
+    """
+    quantities = {}
+    for product_id, quantity in lines:
+        if product_id is None or quantity <= 0:
+            continue
+        quantities[product_id] = quantities.get(product_id, 0) + int(quantity)
+
+    if not quantities:
+        return []
+
+    collection = Product._get_collection()
+    reserved, failed = [], []
+    for product_id, quantity in quantities.items():
+        doc = collection.find_one_and_update(
+            {'_id': product_id, 'stock': {'$gte': quantity}},
+            {'$inc': {'stock': -quantity}},
+            projection={'_id': 1}
+        )
+        if doc is None:
+            failed.append((product_id, quantity))
+        else:
+            reserved.append((product_id, quantity))
+
+    # Échec : stock insuffisant, ou produit supprimé (ignoré)
+    available = {}
+    if failed:
+        available = {
+            doc['_id']: doc.get('stock', 0)
+            for doc in collection.find({'_id': {'$in': [pid for pid, _ in failed]}}, {'stock': 1})
+        }
+    rejected = [
+        {"product_id": str(product_id), "quantity": quantity, "available": available[product_id]}
+        for product_id, quantity in failed
+        if product_id in available
+    ]
+
+    if rejected and reserved:
+        # Tout ou rien : on rend le stock déjà réservé
+        collection.bulk_write(
+            [UpdateOne({'_id': pid}, {'$inc': {'stock': qty}}) for pid, qty in reserved],
+            ordered=False
+        )
+    elif reserved:
+        invalidate_catalog()
+    return rejected
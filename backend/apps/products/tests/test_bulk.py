@@ -0,0 +1,43 @@
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+
+from apps.products import bulk
+
+
+class PriceConversionTests(SimpleTestCase):
+    def test_non_finite_prices_are_row_errors(self):
+        for raw in ('NaN', 'nan', 'Infinity', '-Infinity', 'sNaN'):
+            with self.subTest(raw=raw):
+                with self.assertRaises(bulk.ImportRowError):
+                    bulk._convert('price', raw)
+
+    def test_decimal_comma_is_accepted(self):
+        self.assertEqual(bulk._convert('price', '12,50'), bulk._convert('price', '12.50'))
+
+
+class ImportProductsTests(SimpleTestCase):
+    def _import(self, content):
+        upload = SimpleUploadedFile('products.csv', content.encode('utf-8'))
+        batches = []
+        with mock.patch.object(bulk, '_flush', side_effect=lambda batch, report: batches.append(list(batch))), \
+                mock.patch.object(bulk, 'invalidate_catalog'), \
+                mock.patch.object(bulk, 'search_index'):
+            report = bulk.import_products(upload, 'csv')
+        return report, batches
+
+    def test_nan_row_in_the_middle_does_not_abort_the_import(self):
+        report, batches = self._import(
+            "slug,title,price\n"
+            "canne-a,Canne A,10\n"
+            "canne-b,Canne B,NaN\n"
+            "canne-c,Canne C,12.5\n"
+        )
+
+        self.assertEqual(report['rows'], 3)
+        self.assertEqual(len(report['errors']), 1)
+        self.assertEqual(report['errors'][0]['line'], 3)
+        self.assertIn('Prix invalide', report['errors'][0]['error'])
+        # Les lignes valides, avant ET après, sont écrites
+        self.assertEqual([slug for batch in batches for _, slug, _ in batch], ['canne-a', 'canne-c'])
@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+from bson import ObjectId
+from django.test import SimpleTestCase, override_settings
+
+from apps.products import uploads
+from apps.products.models import Product
+
+
+class FakeProductCollection:
+    """find_one_and_update atomique sur un seul produit, comme MongoDB"""
+
+    def __init__(self, product_id, target_path):
+        self._lock = threading.Lock()
+        self.doc = {'_id': product_id, 'image_status': uploads.IMAGE_PENDING, 'image_pending': target_path}
+
+    def find_one_and_update(self, query, update, **kwargs):
+        with self._lock:
+            if query['_id'] != self.doc['_id'] or query['image_pending'] != self.doc.get('image_pending'):
+                return None
+            if self.doc['image_status'] != uploads.IMAGE_PENDING:
+                return None  # Déjà réservé (verrou non expiré)
+            self.doc.update(update['$set'])
+            return {'_id': self.doc['_id']}
+
+
+class AsyncUploadTests(SimpleTestCase):
+    def setUp(self):
+        self.spool = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spool, ignore_errors=True)
+        self.product_id = ObjectId()
+        self.target = 'products/photo.jpg'
+        with open(os.path.join(self.spool, 'photo.jpg'), 'wb') as fh:
+            fh.write(b'image')
+
+        self.collection = FakeProductCollection(self.product_id, self.target)
+        self.storage = mock.Mock()
+        self.storage.save.side_effect = lambda name, content: name
+        objects = mock.MagicMock()
+        objects.return_value.only.return_value = [SimpleNamespace(id=self.product_id, image_pending=self.target)]
+        objects.return_value.update.return_value = 1
+
+        patches = [
+            mock.patch.object(Product, '_get_collection', return_value=self.collection),
+            mock.patch.object(Product, 'objects', objects),
+            mock.patch.object(uploads, 'default_storage', self.storage),
+            mock.patch.object(uploads, 'optimize_image', return_value=None),
+            mock.patch.object(uploads, 'invalidate_catalog'),
+            # Pool neuf pour ce test
+            mock.patch.object(uploads, '_executor', None),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        settings = override_settings(IMAGE_UPLOADS={'SPOOL_DIR': self.spool, 'ASYNC': True, 'WORKERS': 2, 'RETRIES': 1})
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_enqueue_returns_before_the_upload(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_save(name, content):
+            started.set()
+            release.wait(5)
+            return name
+        self.storage.save.side_effect = slow_save
+
+        uploads.enqueue_upload(self.product_id, self.target)
+        # La requête a rendu la main alors que l'envoi tourne dans le pool
+        self.assertTrue(started.wait(5))
+        self.assertEqual(self.collection.doc['image_status'], uploads.IMAGE_UPLOADING)
+        release.set()
+        uploads._get_executor().shutdown(wait=True)
+        self.storage.save.assert_called_once()
+
+    def test_resume_does_not_push_a_claimed_upload_twice(self):
+        release = threading.Event()
+
+        def slow_save(name, content):
+            release.wait(5)
+            return name
+        self.storage.save.side_effect = slow_save
+
+        uploads.enqueue_upload(self.product_id, self.target)
+        # Un autre process lance resume_image_uploads pendant l'envoi
+        resumers = [threading.Thread(target=uploads.resume_pending_uploads) for _ in range(3)]
+        for thread in resumers:
+            thread.start()
+        for thread in resumers:
+            thread.join(5)
+        release.set()
+        uploads._get_executor().shutdown(wait=True)
+
+        self.storage.save.assert_called_once_with(self.target, mock.ANY)
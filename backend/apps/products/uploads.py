@@ -0,0 +1,218 @@
+# backend/apps/products/uploads.py
+"""
+Envoi des images produits vers le stockage (Cloudinary ou local).
+
+La vue admin écrit le fichier reçu dans un dossier tampon local (spool) et
+enregistre le produit avec image_status="pending". Le fichier est ensuite
+poussé vers default_storage (avec nouvelles tentatives) puis le produit
+est mis à jour.
+
+Par défaut (IMAGE_UPLOADS['ASYNC'] = False) l'envoi se fait dans la
+requête : sur Vercel (serverless) ni un pool de threads ni le dossier /tmp
+ne survivent à la fin de l'invocation. Le mode pool de threads, qui répond
+avant la fin de l'envoi, est réservé aux serveurs qui tournent en continu.
+Les envois interrompus (redémarrage) y sont repris par la commande
+`manage.py resume_image_uploads`.
+
+Chaque envoi "réserve" d'abord le produit (find_one_and_update sur
+image_status) : deux process ne poussent jamais le même fichier, et une
+réservation abandonnée par un process mort expire après LOCK_SECONDS.
+Si un nouvel upload remplace le premier avant la fin, le premier est
+abandonné : seul le chemin noté dans `image_pending` est appliqué.
+"""
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+from .cache import invalidate_catalog
+from .image_processing import optimize_image
+
+# États de l'image d'un produit
+IMAGE_READY = 'ready'
+IMAGE_PENDING = 'pending'
+IMAGE_UPLOADING = 'uploading'
+IMAGE_FAILED = 'failed'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _config():
+    return getattr(settings, 'IMAGE_UPLOADS', {})
+
+
+def spool_dir():
+    path = _config().get('SPOOL_DIR') or os.path.join(tempfile.gettempdir(), 'bahri_upload_spool')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_config().get('WORKERS', 2),
+                thread_name_prefix='image-upload'
+            )
+        return _executor
+
+
+# =========================================================
+# 1. CÔTÉ REQUÊTE : ÉCRITURE DANS LE SPOOL
+# =========================================================
+def spool_upload(file):
+    """
+    Copie le fichier reçu dans le spool, par morceaux, sans le décoder (la
+    réduction de l'image est faite à l'envoi, voir _push).
+    Retourne le chemin cible dans le stockage (ex: "products/<uuid>.jpg").
+    """
+    ext = os.path.splitext(file.name)[1].lower()
+    if not ext:
+        ext = '.jpg'
+
+    # Nom unique (UUID) : évite les conflits de noms sur Cloudinary
+    name = uuid.uuid4().hex + ext
+    with open(os.path.join(spool_dir(), name), 'wb') as out:
+        for chunk in file.chunks():
+            out.write(chunk)
+    return f"products/{name}"
+
+
+def _spool_path(target_path):
+    return os.path.join(spool_dir(), os.path.basename(target_path))
+
+
+def enqueue_upload(product_id, target_path):
+    """Planifie l'envoi du fichier du spool vers le stockage"""
+    if _config().get('ASYNC', False):
+        _get_executor().submit(_run, str(product_id), target_path)
+    else:
+        _run(str(product_id), target_path)
+
+
+# =========================================================
+# 2. CÔTÉ WORKER : ENVOI + MISE À JOUR DU PRODUIT
+# =========================================================
+def _clean_path(saved_path):
+    # On normalise les slashs pour la BDD
+    path = saved_path.replace('\\', '/')
+    # Hack pour le Local : si Django renvoie "media/products/...", on nettoie.
+    if path.startswith('media/'):
+        path = path.replace('media/', '', 1)
+    return path
+
+
+def _run(product_id, target_path):
+    # Une exception dans un thread du pool serait perdue : on la journalise
+    try:
+        _push(product_id, target_path)
+    except Exception as e:
+        print(f"❌ Erreur upload image {target_path} (produit {product_id}) : {e}")
+
+
+def _claim(product_id, target_path):
+    """Réserve l'envoi de `target_path` (atomique entre process)"""
+    from .models import Product
+
+    now = datetime.utcnow()
+    lock = timedelta(seconds=_config().get('LOCK_SECONDS', 300))
+    return Product._get_collection().find_one_and_update(
+        {
+            '_id': product_id,
+            'image_pending': target_path,
+            '$or': [
+                {'image_status': IMAGE_PENDING},
+                # Réservation d'un process mort en cours d'envoi
+                {'image_status': IMAGE_UPLOADING, 'image_lock_until': {'$lte': now}},
+            ],
+        },
+        {'$set': {'image_status': IMAGE_UPLOADING, 'image_lock_until': now + lock}},
+        projection={'_id': 1}
+    ) is not None
+
+
+def _push(product_id, target_path):
+    from .models import Product
+
+    if not _claim(ObjectId(product_id), target_path):
+        return  # Déjà pris en charge ou remplacé par un upload plus récent
+
+    local_path = _spool_path(target_path)
+    retries = _config().get('RETRIES', 3)
+    backoff = _config().get('BACKOFF', 2)
+
+    # Redimensionnement + réencodage (voir image_processing.py) vers un
+    # fichier à part : le fichier reçu reste disponible pour une reprise
+    upload_path, storage_name = local_path, target_path
+    if os.path.exists(local_path):
+        base = os.path.splitext(target_path)[0]
+        optimized_base = os.path.splitext(local_path)[0] + '.optimized'
+        optimized_ext = optimize_image(local_path, optimized_base)
+        if optimized_ext:
+            upload_path = optimized_base + optimized_ext
+            storage_name = base + optimized_ext
+
+    saved_path = None
+    for attempt in range(1, retries + 1):
+        try:
+            with open(upload_path, 'rb') as fh:
+                saved_path = default_storage.save(storage_name, File(fh))
+            break
+        except FileNotFoundError:
+            print(f"❌ Fichier spool introuvable : {local_path}")
+            break
+        except Exception as e:
+            print(f"⚠️ Upload image {storage_name} (essai {attempt}/{retries}) : {e}")
+            if attempt < retries:
+                time.sleep(backoff * 2 ** (attempt - 1))
+
+    # On n'applique le résultat que si aucun upload plus récent ne l'a remplacé
+    pending = Product.objects(id=product_id, image_pending=target_path)
+    if saved_path:
+        updated = pending.update(
+            set__image=_clean_path(saved_path),
+            set__image_status=IMAGE_READY,
+            unset__image_pending=True,
+            unset__image_lock_until=True
+        )
+        print(f"✅ Image sauvegardée sous : {_clean_path(saved_path)}")
+    else:
+        updated = pending.update(set__image_status=IMAGE_FAILED, unset__image_lock_until=True)
+
+    for path in {local_path, upload_path}:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    # update() ne passe pas par Product.save() : invalidation manuelle
+    if updated:
+        invalidate_catalog()
+
+
+def resume_pending_uploads():
+    """
+    Relance les envois interrompus dont le fichier est encore dans le spool
+    (voir `manage.py resume_image_uploads`). Chaque envoi est réservé par
+    _claim() : lancer la commande depuis plusieurs process est sans risque.
+    """
+    from .models import Product
+
+    resumed = 0
+    statuses = (IMAGE_PENDING, IMAGE_UPLOADING)
+    pending = Product.objects(image_status__in=statuses).only('id', 'image_pending')
+    for product in pending:
+        if product.image_pending and os.path.exists(_spool_path(product.image_pending)):
+            _run(str(product.id), product.image_pending)
+            resumed += 1
+    return resumed
@@ -2,10 +2,13 @@ from django.urls import path
 
 # 1. Imports des vues PUBLIQUES (views.py)
 # Note : On a retiré ProductCreateView car c'est une action admin maintenant
-from .views import ProductListView, ProductDetailView, CategoryListView
+from .views import ProductListView, ProductDetailView, CategoryListView, ProductSuggestView
 
 # 2. Imports des vues ADMIN (admin_views.py)
-from .admin_views import AdminProductListCreateView, AdminProductDetailView
+from .admin_views import (
+    AdminProductListCreateView, AdminProductDetailView,
+    AdminProductImportView, AdminProductExportView, AdminInventoryUpdateView,
+)
 
 urlpatterns = [
     # ============================================
@@ -18,6 +21,13 @@ urlpatterns = [
     # Liste complète pour l'admin (GET) - Affiche aussi les produits inactifs
     path('admin/all/', AdminProductListCreateView.as_view(), name='admin-product-list'),
 
+    # Import / export en masse (CSV ou JSONL) - AVANT la route par ID
+    path('admin/import/', AdminProductImportView.as_view(), name='admin-product-import'),
+    path('admin/export/', AdminProductExportView.as_view(), name='admin-product-export'),
+
+    # Mise à jour prix / stock en masse (synchro fournisseur)
+    path('admin/inventory/', AdminInventoryUpdateView.as_view(), name='admin-inventory-update'),
+
     # Modification (PUT) et Suppression (DELETE) par ID
     path('admin/<str:product_id>/', AdminProductDetailView.as_view(), name='admin-product-detail'),
 
@@ -31,6 +41,9 @@ urlpatterns = [
     
     # Liste des catégories pour le menu
     path('categories/', CategoryListView.as_view(), name='category-list'),
+
+    # Autocomplétion de la recherche (?q=...)
+    path('suggest/', ProductSuggestView.as_view(), name='product-suggest'),
     
     # Détail produit (Slug) - À METTRE TOUJOURS EN DERNIER
     # car <slug:slug> peut "manger" les autres URLs si placé avant
@@ -3,45 +3,135 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 
-from .models import Product, Category
+from core.pagination import NEXT_CURSOR_HEADER, InvalidCursor, is_paginated, paginate_keyset, paginate_ranked
+from .cache import cached_catalog_response
+from .facets import SORTS, TRUE_VALUES, catalog_facets, merge, parse_filters
+from .models import Product
+from .prefetch import prefetch_categories
+from .registry import category_registry
+from .search import search_index
 from .serializers import ProductSerializer, CategorySerializer
 
 class CategoryListView(APIView):
     """(Public) Liste les catégories pour le menu"""
     permission_classes = [AllowAny]
 
+    @cached_catalog_response
     def get(self, request):
-        categories = Category.objects.all()
-        serializer = CategorySerializer(categories, many=True)
+        # Servies depuis le registre en mémoire (registry.py)
+        serializer = CategorySerializer(category_registry.all(), many=True)
         return Response(serializer.data)
 
 class ProductListView(APIView):
-    """(Public) Liste les produits avec filtres"""
+    """
+    (Public) Liste les produits avec filtres.
+    - ?category=slug&min_price=10&max_price=200&in_stock=1 : filtres (voir facets.py)
+    - ?sort=newest|price|-price : tri (par défaut : plus récents d'abord)
+    - ?fields=title,price,image : ne lit et ne renvoie que ces colonnes
+    - ?image=thumb|card|full|webp : "image" pointe vers cette variante réduite
+    - ?search=... : recherche plein texte (titre, catégorie, description),
+      résultats classés par pertinence sauf si ?sort= est fourni (voir search.py)
+    - ?page_size=24&cursor=... : pagination par curseur sur (champ de tri, id).
+      La réponse devient alors {"results": [...], "next_cursor": ...}
+      (+ "facets" avec ?facets=1)
+    Toute réponse est bornée à une page (API_PAGE_SIZE, au plus
+    API_MAX_PAGE_SIZE) : sans page_size ni cursor, on garde l'ancien format
+    (tableau nu) pour les anciens clients, limité à la première page, et le
+    curseur suivant est dans l'en-tête X-Next-Cursor.
+    """
     permission_classes = [AllowAny]
 
+    @cached_catalog_response
     def get(self, request):
-        category_slug = request.query_params.get('category')
-        search_query = request.query_params.get('search')
-        
-        # On affiche uniquement les produits actifs aux clients
-        products = Product.objects(is_active=True)
+        params = request.query_params
+        category_slug = params.get('category')
+        search_query = params.get('search')
+        sort = params.get('sort')
+        # Enveloppe {"results", "next_cursor"} si le client pagine lui-même
+        paginated = is_paginated(request)
+        empty = {"results": [], "next_cursor": None} if paginated else []
+
+        if sort and sort not in SORTS:
+            return Response({"error": f"sort doit valoir : {', '.join(SORTS)}"}, status=status.HTTP_400_BAD_REQUEST)
+        sort_field, descending = SORTS[sort or 'newest']
 
+        category_id = None
         if category_slug:
-            cat = Category.objects(slug=category_slug).first()
-            if not cat:
-                return Response([], status=status.HTTP_200_OK)
-            products = products.filter(category=cat)
+            # slug -> id sans requête (registre en mémoire)
+            category_id = category_registry.id_for_slug(category_slug)
+            if category_id is None:
+                return Response(empty, status=status.HTTP_200_OK)
 
+        try:
+            filters = parse_filters(params, category_id)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # On affiche uniquement les produits actifs aux clients
+        base_match = {'is_active': True}
+        products = Product.objects(__raw__=merge(base_match, *filters.values()))
+
+        ranked_ids = None
         if search_query:
-            products = products.filter(title__icontains=search_query)
+            matches = search_index.search(search_query)
+            base_match['_id'] = {'$in': matches}
+            if sort:
+                # Tri explicite : on garde les résultats, pas l'ordre de pertinence
+                products = products.filter(id__in=matches)
+            else:
+                ranked_ids = matches
 
-        serializer = ProductSerializer(products, many=True, context={'request': request})
-        return Response(serializer.data)
+        # Projection : on ne charge depuis Mongo que ce que la grille affiche
+        fields = ProductSerializer.parse_fields(params.get('fields'))
+        if fields:
+            products = products.only(*ProductSerializer.projection(fields), sort_field)
+
+        try:
+            if ranked_ids is not None:
+                page, next_cursor = paginate_ranked(products, ranked_ids, request)
+            else:
+                page, next_cursor = paginate_keyset(products, request, field=sort_field, descending=descending)
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        context = {'request': request, 'image_variant': params.get('image')}
+        if not fields or 'category' in fields:
+            # Une seule requête $in pour toutes les catégories de la page
+            context['categories'] = prefetch_categories(page)
+
+        serializer = ProductSerializer(page, many=True, fields=fields, context=context)
+        if not paginated:
+            # Ancien format (tableau nu), mais toujours une seule page
+            response = Response(serializer.data)
+            if next_cursor:
+                response[NEXT_CURSOR_HEADER] = next_cursor
+            return response
+
+        data = {"results": serializer.data, "next_cursor": next_cursor}
+        if params.get('facets') in TRUE_VALUES:
+            data["facets"] = catalog_facets(base_match, filters)
+        return Response(data)
+
+class ProductSuggestView(APIView):
+    """
+    (Public) Autocomplétion de la barre de recherche : ?q=moul&limit=8
+    Servie entièrement depuis l'index en mémoire (search.py).
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        try:
+            limit = min(max(int(request.query_params.get('limit', 8)), 1), 20)
+        except ValueError:
+            limit = 8
+        return Response(search_index.suggest(query, limit=limit))
 
 class ProductDetailView(APIView):
     """(Public) Détail d'un produit via slug"""
     permission_classes = [AllowAny]
 
+    @cached_catalog_response
     def get(self, request, slug):
         product = Product.objects(slug=slug, is_active=True).first()
         if not product:
@@ -1,8 +1,57 @@
 import jwt
 import time
+import uuid
+from datetime import datetime
+from bson import ObjectId
 from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from mongoengine.errors import NotUniqueError
 from rest_framework import authentication, exceptions
-from .models import User
+from .models import RevokedToken, User
+from .user_cache import get_decision, set_decision
+
+# Seuls champs mis en cache : la décision d'authentification / de permission
+AUTH_FIELDS = ('is_active', 'is_admin')
+
+
+class AuthUser(SimpleLazyObject):
+    """
+    request.user : id et droits (is_active, is_admin) connus sans requête,
+    document User COMPLET chargé à la première autre utilisation (comme
+    request.user dans django.contrib.auth). Jamais de document partiel :
+    un .save() sur request.user écrit le profil entier.
+    """
+
+    def __init__(self, user_id, decision):
+        super().__init__(lambda: User.objects(id=user_id).first())
+        # Attributs servis sans charger le document (voir LazyObject)
+        self.__dict__.update(
+            id=user_id,
+            pk=user_id,
+            is_active=decision['is_active'],
+            is_admin=decision['is_admin'],
+            is_staff=decision['is_admin'],
+            is_authenticated=True,
+            is_anonymous=False,
+        )
+
+
+def get_auth_user(user_id):
+    """request.user (AuthUser) à partir de la décision en cache, ou None"""
+    if not ObjectId.is_valid(str(user_id)):
+        return None
+    user_id = ObjectId(str(user_id))
+    decision = get_decision(user_id)
+    if decision is None:
+        doc = User.objects(id=user_id).only(*AUTH_FIELDS).as_pymongo().first()
+        if doc is None:
+            return None
+        decision = {
+            'is_active': doc.get('is_active', True),
+            'is_admin': doc.get('is_admin', False),
+        }
+        set_decision(user_id, decision)
+    return AuthUser(user_id, decision)
 
 class JWTAuthentication(authentication.BaseAuthentication):
     """
@@ -29,9 +78,13 @@ class JWTAuthentication(authentication.BaseAuthentication):
             if payload['exp'] < time.time():
                 raise exceptions.AuthenticationFailed('Token expired')
 
-            # Récupération de l'utilisateur MongoEngine
-            user = User.objects(id=payload['user_id']).first()
-            if not user:
+            # Un refresh token ne sert qu'à /token/refresh/
+            if payload.get('type') == 'refresh':
+                raise exceptions.AuthenticationFailed('Refresh token cannot be used for authentication')
+
+            # Récupération de l'utilisateur (cache, sinon lecture projetée)
+            user = get_auth_user(payload['user_id'])
+            if user is None:
                 raise exceptions.AuthenticationFailed('User not found')
 
             if not user.is_active:
@@ -68,10 +121,63 @@ def generate_tokens(user):
         'user_id': str(user.id),
         'exp': now + (7 * 24 * 3600),
         'iat': now,
-        'type': 'refresh'
+        'type': 'refresh',
+        'jti': uuid.uuid4().hex  # Identifiant unique, pour la révocation
     }
     
     return {
         'access': jwt.encode(access_payload, settings.SECRET_KEY, algorithm='HS256'),
         'refresh': jwt.encode(refresh_payload, settings.SECRET_KEY, algorithm='HS256')
-    }
\ No newline at end of file
+    }
+
+
+# =================================================================
+# REFRESH : NOUVEL ACCESS TOKEN SANS MOT DE PASSE
+# =================================================================
+class InvalidRefreshToken(Exception):
+    """Refresh token expiré, falsifié, déjà utilisé ou utilisateur inactif"""
+
+
+def revoke_refresh_token(payload):
+    """
+    Marque le refresh token comme utilisé. Retourne False s'il l'était déjà.
+    L'index unique sur jti rend l'opération atomique : deux refresh
+    simultanés avec le même token ne peuvent pas réussir tous les deux.
+    """
+    jti = payload.get('jti')
+    if not jti:
+        return True  # Ancien token sans jti : non révocable, expire seul
+    try:
+        RevokedToken(jti=jti, expires_at=datetime.utcfromtimestamp(payload['exp'])).save()
+    except NotUniqueError:
+        return False
+    return True
+
+
+def refresh_tokens(refresh_token):
+    """
+    Vérifie un refresh token et renvoie de nouveaux tokens.
+    Avec JWT_ROTATE_REFRESH_TOKENS, l'ancien refresh token est révoqué et un
+    nouveau est fourni ; sinon seul l'access token est renouvelé.
+    Lève InvalidRefreshToken.
+    """
+    try:
+        payload = jwt.decode(refresh_token, settings.SECRET_KEY, algorithms=['HS256'])
+    except jwt.PyJWTError:
+        raise InvalidRefreshToken('Refresh token invalide ou expiré')
+
+    if payload.get('type') != 'refresh':
+        raise InvalidRefreshToken('Refresh token attendu')
+
+    # Utilisateur lu depuis le cache d'authentification (pas de bcrypt)
+    user = get_auth_user(payload['user_id'])
+    if user is None or not user.is_active:
+        raise InvalidRefreshToken('Utilisateur introuvable ou inactif')
+
+    if not getattr(settings, 'JWT_ROTATE_REFRESH_TOKENS', True):
+        return {'access': generate_tokens(user)['access'], 'refresh': refresh_token}
+
+    if not revoke_refresh_token(payload):
+        raise InvalidRefreshToken('Refresh token déjà utilisé')
+    return generate_tokens(user)
+
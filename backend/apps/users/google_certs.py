@@ -0,0 +1,119 @@
+# backend/apps/users/google_certs.py
+"""
+Vérification locale des ID tokens Google, avec certificats en cache.
+
+id_token.verify_oauth2_token() retéléchargeait les certificats publics de
+Google à chaque connexion. Ici ils sont gardés en mémoire aussi longtemps
+que l'autorise le Cache-Control (max-age) de la réponse, via une session
+HTTP réutilisée (connexions gardées ouvertes). La vérification de la
+signature est ensuite purement locale.
+
+Le téléchargement se fait hors du verrou : pendant qu'un thread rafraîchit
+des certificats expirés, les autres connexions continuent avec ceux déjà
+en mémoire au lieu d'attendre la réponse de Google.
+
+L'URL est configurable (GOOGLE_CERTS_URL) pour tester contre un serveur
+de certificats local.
+"""
+import base64
+import json
+import re
+import threading
+import time
+
+import requests
+from django.conf import settings
+from google.auth import jwt as google_jwt
+
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+
+# Durée de cache si la réponse n'indique pas de max-age (secondes)
+DEFAULT_MAX_AGE = 3600
+# Délai minimal entre deux téléchargements forcés (clé inconnue)
+MIN_REFRESH_INTERVAL = 60
+
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+def _key_id(token):
+    """kid de l'en-tête du token (None si absent ou illisible)"""
+    try:
+        if isinstance(token, bytes):
+            token = token.decode('ascii')
+        segment = token.split('.', 1)[0]
+        header = json.loads(base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4)))
+        return header.get('kid')
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+class GoogleCertCache:
+    def __init__(self):
+        self._session = requests.Session()
+        self._lock = threading.Lock()
+        self._certs = None
+        self._expires_at = 0
+        self._fetched_at = 0
+        self._refreshing = False
+
+    def _url(self):
+        return getattr(settings, 'GOOGLE_CERTS_URL', 'https://www.googleapis.com/oauth2/v1/certs')
+
+    def _fetch(self):
+        """(certificats, max-age) : appelé SANS le verrou"""
+        response = self._session.get(self._url(), timeout=5)
+        response.raise_for_status()
+        match = _MAX_AGE.search(response.headers.get('Cache-Control', ''))
+        return response.json(), int(match.group(1)) if match else DEFAULT_MAX_AGE
+
+    def get_certs(self, force=False):
+        """{"kid": "certificat x509"} en cache, retéléchargé à expiration"""
+        with self._lock:
+            now = time.monotonic()
+            if force and now - self._fetched_at < MIN_REFRESH_INTERVAL:
+                force = False  # Évite de marteler Google avec des tokens bidons
+            stale = force or self._certs is None or now >= self._expires_at
+            if not stale or (self._refreshing and self._certs is not None):
+                # À jour, ou rafraîchissement déjà en cours dans un autre thread
+                return self._certs
+            self._refreshing = True
+
+        try:
+            certs, max_age = self._fetch()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+        with self._lock:
+            now = time.monotonic()
+            self._certs = certs
+            self._fetched_at = now
+            self._expires_at = now + max_age
+            return certs
+
+    def verify(self, token, audience):
+        """
+        Équivalent local de id_token.verify_oauth2_token().
+        Retourne les claims ; lève ValueError si le token est invalide.
+        """
+        certs = self.get_certs()
+        key_id = _key_id(token)
+        if key_id and key_id not in certs:
+            # Clé inconnue : Google a peut-être tourné ses certificats
+            certs = self.get_certs(force=True)
+        claims = google_jwt.decode(token, certs=certs, audience=audience)
+
+        if claims.get('iss') not in GOOGLE_ISSUERS:
+            raise ValueError(f"Émetteur invalide : {claims.get('iss')}")
+        return claims
+
+    def clear(self):
+        with self._lock:
+            self._certs = None
+            self._expires_at = 0
+            self._fetched_at = 0
+            self._refreshing = False
+
+
+# Instance unique par process
+google_certs = GoogleCertCache()
@@ -0,0 +1,73 @@
+# backend/apps/users/hashing.py
+"""
+Service de hachage des mots de passe (bcrypt).
+
+bcrypt est volontairement lent (~0,2 s au coût 12). Les calculs passent
+par un pool de threads borné (PASSWORD_HASH_WORKERS) : une rafale de
+connexions fait la queue au lieu d'occuper tous les cœurs du worker, et
+les autres requêtes continuent d'être servies (bcrypt libère le GIL).
+
+Le coût cible est BCRYPT_ROUNDS ; un hash stocké avec un autre coût est
+signalé par needs_rehash() et remplacé à la connexion suivante.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from django.conf import settings
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _rounds():
+    return getattr(settings, 'BCRYPT_ROUNDS', 12)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'PASSWORD_HASH_WORKERS', 2),
+                thread_name_prefix='bcrypt'
+            )
+        return _executor
+
+
+def _run(fn, *args):
+    # Le thread de la requête attend son tour dans le pool borné
+    return _get_executor().submit(fn, *args).result()
+
+
+def _hash(raw_password, rounds):
+    return bcrypt.hashpw(raw_password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _verify(raw_password, hashed):
+    try:
+        return bcrypt.checkpw(raw_password.encode('utf-8'), hashed.encode('utf-8'))
+    except ValueError:
+        # Hash illisible (ancien format, champ corrompu...)
+        return False
+
+
+def hash_password(raw_password):
+    """Mot de passe en clair -> hash bcrypt au coût BCRYPT_ROUNDS"""
+    return _run(_hash, raw_password, _rounds())
+
+
+def verify_password(raw_password, hashed):
+    """Le mot de passe correspond-il au hash stocké ?"""
+    if not hashed:
+        return False
+    return _run(_verify, raw_password, hashed)
+
+
+def needs_rehash(hashed):
+    """Vrai si le hash a été calculé avec un autre coût que BCRYPT_ROUNDS"""
+    try:
+        # Format : $2b$<coût>$<sel + hash>
+        return int(hashed.split('$')[2]) != _rounds()
+    except (AttributeError, IndexError, ValueError):
+        return True
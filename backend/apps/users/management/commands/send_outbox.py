@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.users.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    help = "Envoie les emails en attente dans la file OutboxEmail (ex : tâche cron)"
+
+    def handle(self, *args, **options):
+        count = drain_outbox()
+        self.stdout.write(self.style.SUCCESS(f"✅ {count} emails envoyés"))
@@ -1,7 +1,9 @@
 import mongoengine as me
-import bcrypt
 from datetime import datetime
 
+from .hashing import hash_password, needs_rehash, verify_password
+from .user_cache import invalidate_user
+
 # =================================================================
 # MODÈLE UTILISATEUR (FUSIONNÉ)
 # =================================================================
@@ -64,19 +66,38 @@ class User(me.Document):
         return False
 
     # =================================================================
-    # GESTION MOT DE PASSE (BCRYPT)
+    # GESTION MOT DE PASSE (BCRYPT, voir hashing.py)
     # =================================================================
     def set_password(self, raw_password):
         """Hache le mot de passe avant de le stocker"""
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(raw_password.encode('utf-8'), salt)
-        self.password = hashed.decode('utf-8')
+        self.password = hash_password(raw_password)
 
     def check_password(self, raw_password):
         """Vérifie le mot de passe haché"""
         if not self.password:
             return False
-        return bcrypt.checkpw(raw_password.encode('utf-8'), self.password.encode('utf-8'))
+        return verify_password(raw_password, self.password)
+
+    def upgrade_password(self, raw_password):
+        """
+        Après une connexion réussie : rehache si le coût bcrypt stocké
+        diffère de BCRYPT_ROUNDS. Ne sauvegarde que le champ password.
+        """
+        if self.password and needs_rehash(self.password):
+            self.set_password(raw_password)
+            self.save()
+
+    # =================================================================
+    # INVALIDATION DU CACHE D'AUTHENTIFICATION (voir user_cache.py)
+    # =================================================================
+    def save(self, *args, **kwargs):
+        result = super(User, self).save(*args, **kwargs)
+        invalidate_user(self.id)
+        return result
+
+    def delete(self, *args, **kwargs):
+        invalidate_user(self.id)
+        return super(User, self).delete(*args, **kwargs)
 
     def __str__(self):
         return self.email
@@ -120,4 +141,51 @@ class PasswordResetCode(me.Document):
         'indexes': [
             {'fields': ['created_at'], 'expireAfterSeconds': 3600}
         ]
-    }
\ No newline at end of file
+    }
+
+
+# =================================================================
+# REFRESH TOKENS RÉVOQUÉS (rotation, voir authentication.py)
+# =================================================================
+class RevokedToken(me.Document):
+    # Identifiant unique (claim "jti") du refresh token déjà utilisé
+    jti = me.StringField(required=True, unique=True)
+    # Date d'expiration du token : MongoDB supprime l'entrée ensuite (TTL)
+    expires_at = me.DateTimeField(required=True)
+
+    meta = {
+        'collection': 'revoked_tokens',
+        'indexes': [
+            {'fields': ['expires_at'], 'expireAfterSeconds': 0}
+        ]
+    }
+
+
+# =================================================================
+# FILE D'ATTENTE DES EMAILS SORTANTS (voir outbox.py)
+# =================================================================
+class OutboxEmail(me.Document):
+    subject = me.StringField(required=True)
+    body = me.StringField(required=True)
+    from_email = me.StringField()
+    to = me.ListField(me.StringField(), required=True)
+
+    # pending -> sending -> sent (ou failed après MAX_ATTEMPTS essais)
+    status = me.StringField(default='pending', choices=('pending', 'sending', 'sent', 'failed'))
+    attempts = me.IntField(default=0)
+    # Prochain essai (backoff) ; en "sending", fin du verrou du worker
+    next_attempt_at = me.DateTimeField(default=datetime.utcnow)
+    last_error = me.StringField()
+
+    created_at = me.DateTimeField(default=datetime.utcnow)
+    sent_at = me.DateTimeField()
+
+    meta = {
+        'collection': 'email_outbox',
+        'indexes': [
+            ('status', 'next_attempt_at'),
+            # Les emails envoyés sont purgés au bout de 7 jours
+            {'fields': ['sent_at'], 'expireAfterSeconds': 7 * 24 * 3600}
+        ]
+    }
+
@@ -0,0 +1,196 @@
+# backend/apps/users/outbox.py
+"""
+Envoi des emails via une file (outbox).
+
+La vue enregistre l'email dans la collection OutboxEmail, puis la file est
+vidée par lots sur UNE seule connexion SMTP (pas de poignée de main TLS
+par email), avec nouvelles tentatives et backoff exponentiel en cas
+d'échec.
+
+Par défaut (EMAIL_OUTBOX['ASYNC'] = False) l'email qui vient d'être mis
+en file est envoyé dans la requête, avant la réponse : sur Vercel
+(serverless) un thread d'arrière-plan meurt avec l'invocation. Seul CET
+email est envoyé : la durée de la requête ne dépend pas de la file. Les
+emails en échec (et le reste de la file) sont renvoyés par
+`manage.py send_outbox`, lancé par un planificateur (cron). Le thread
+d'envoi (ASYNC = True, réponse immédiate) est réservé aux serveurs qui
+tournent en continu.
+
+Les emails sont "réservés" un par un (find_one_and_update) : plusieurs
+workers ou la commande `manage.py send_outbox` peuvent vider la file en
+même temps sans doublons. Un email réservé par un worker mort est repris
+à l'expiration de son verrou.
+"""
+import threading
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from pymongo import ReturnDocument
+
+from .models import OutboxEmail
+
+_wake = threading.Event()
+_sender = None
+_sender_lock = threading.Lock()
+
+
+def _config():
+    return getattr(settings, 'EMAIL_OUTBOX', {})
+
+
+# =========================================================
+# 1. CÔTÉ REQUÊTE : MISE EN FILE
+# =========================================================
+def enqueue_email(subject, body, to, from_email=None):
+    """Enregistre l'email à envoyer puis l'envoie (ou réveille le thread d'envoi)"""
+    email = OutboxEmail(
+        subject=subject,
+        body=body,
+        to=list(to),
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL
+    ).save()
+
+    if _config().get('ASYNC', False):
+        _start_sender()
+        _wake.set()
+    else:
+        send_now(email.id)
+    return email
+
+
+def _start_sender():
+    global _sender
+    with _sender_lock:
+        if _sender is None or not _sender.is_alive():
+            _sender = threading.Thread(target=_sender_loop, name='email-outbox', daemon=True)
+            _sender.start()
+
+
+def _sender_loop():
+    while True:
+        # Réveil à chaque mise en file, sinon toutes les POLL_INTERVAL secondes
+        _wake.wait(_config().get('POLL_INTERVAL', 30))
+        _wake.clear()
+        try:
+            drain_outbox()
+        except Exception as e:
+            print(f"❌ Erreur outbox : {e}")
+
+
+# =========================================================
+# 2. CÔTÉ ENVOI : VIDAGE DE LA FILE
+# =========================================================
+def _claim(collection, email_id=None):
+    """Réserve le prochain email à envoyer, ou celui-ci (atomique entre workers)"""
+    now = datetime.utcnow()
+    lock = timedelta(seconds=_config().get('LOCK_SECONDS', 300))
+    query = {'status': {'$in': ['pending', 'sending']}, 'next_attempt_at': {'$lte': now}}
+    if email_id is not None:
+        query['_id'] = email_id
+    return collection.find_one_and_update(
+        query,
+        {'$set': {'status': 'sending', 'next_attempt_at': now + lock}, '$inc': {'attempts': 1}},
+        sort=[('next_attempt_at', 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def _failed(collection, doc, error):
+    max_attempts = _config().get('MAX_ATTEMPTS', 5)
+    backoff = _config().get('BACKOFF', 30)
+    if doc['attempts'] >= max_attempts:
+        update = {'status': 'failed', 'last_error': error}
+    else:
+        delay = backoff * 2 ** (doc['attempts'] - 1)
+        update = {
+            'status': 'pending',
+            'next_attempt_at': datetime.utcnow() + timedelta(seconds=delay),
+            'last_error': error,
+        }
+    collection.update_one({'_id': doc['_id']}, {'$set': update})
+    print(f"⚠️ Email {doc['_id']} (essai {doc['attempts']}/{max_attempts}) : {error}")
+
+
+def _send_batch(collection, docs):
+    """
+    Envoie les emails réservés `docs` sur une seule connexion SMTP.
+    Retourne le nombre envoyés, ou None si la connexion a échoué.
+    """
+    connection = get_connection(fail_silently=False)
+    try:
+        # Une connexion (et une poignée de main TLS) pour tout le lot
+        connection.open()
+    except Exception as e:
+        for doc in docs:
+            _failed(collection, doc, str(e))
+        return None
+
+    sent = 0
+    try:
+        for doc in docs:
+            message = EmailMessage(
+                subject=doc['subject'],
+                body=doc['body'],
+                from_email=doc.get('from_email'),
+                to=doc['to'],
+                connection=connection
+            )
+            try:
+                connection.send_messages([message])
+            except Exception as e:
+                _failed(collection, doc, str(e))
+                # Connexion peut-être cassée : on repart sur une neuve
+                connection.close()
+                try:
+                    connection.open()
+                except Exception:
+                    pass
+                continue
+            collection.update_one(
+                {'_id': doc['_id']},
+                {'$set': {'status': 'sent', 'sent_at': datetime.utcnow()}, '$unset': {'last_error': 1}}
+            )
+            sent += 1
+    finally:
+        connection.close()
+    return sent
+
+
+def send_now(email_id):
+    """Envoie tout de suite cet email (s'il n'est pas déjà pris). Vrai si envoyé."""
+    collection = OutboxEmail._get_collection()
+    doc = _claim(collection, email_id)
+    if doc is None:
+        return False
+    return bool(_send_batch(collection, [doc]))
+
+
+def drain_outbox():
+    """
+    Envoie les emails en attente, par lots de EMAIL_OUTBOX['BATCH_SIZE'],
+    chaque lot sur une seule connexion SMTP. Retourne le nombre envoyés.
+    """
+    collection = OutboxEmail._get_collection()
+    batch_size = _config().get('BATCH_SIZE', 50)
+    sent = 0
+
+    while True:
+        docs = []
+        while len(docs) < batch_size:
+            doc = _claim(collection)
+            if doc is None:
+                break
+            docs.append(doc)
+        if not docs:
+            break
+
+        batch_sent = _send_batch(collection, docs)
+        if batch_sent is None:
+            break  # Serveur SMTP injoignable : on réessaiera plus tard
+        sent += batch_sent
+
+        if len(docs) < batch_size:
+            break  # File vidée
+
+    return sent
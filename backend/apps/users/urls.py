@@ -8,6 +8,7 @@ from .views import (
     ResetPasswordView,
     VerifyCodeView,
     GoogleLoginView,
+    TokenRefreshView,
     # 👇 NOUVEAUX IMPORTS POUR L'ADMIN 👇
     AdminUserListView,
     AdminUserDetailView
@@ -20,6 +21,7 @@ urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
     path('google-login/', GoogleLoginView.as_view(), name='google-login'),
+    path('token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
 
     # ====================================================
     # 👤 GESTION DU PROFIL
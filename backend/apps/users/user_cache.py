@@ -0,0 +1,66 @@
+# backend/apps/users/user_cache.py
+"""
+Cache des décisions d'authentification JWT.
+
+Chaque requête authentifiée relisait le document User complet. On garde ici,
+par user id, uniquement la décision utile aux permissions :
+{"is_active", "is_admin"} — jamais un document (voir authentication.AuthUser).
+
+- Avec un cache partagé (JWT_USER_CACHE['SHARED_CACHE'], ex : Redis), c'est
+  la seule source : l'invalidation à chaque User.save() / delete() est vue
+  immédiatement par tous les workers.
+- Sans cache partagé : cache local au process (cachetools, taille bornée).
+  Les AUTRES workers voient un compte désactivé ou un admin rétrogradé au
+  plus tard après le TTL (court, 5 s par défaut).
+"""
+import threading
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.core.cache import caches
+
+
+def _config():
+    return getattr(settings, 'JWT_USER_CACHE', {})
+
+
+_local = TTLCache(maxsize=_config().get('MAXSIZE', 2048), ttl=_config().get('TTL', 5))
+_lock = threading.Lock()
+
+
+def _shared():
+    alias = _config().get('SHARED_CACHE')
+    return caches[alias] if alias else None
+
+
+def _key(user_id):
+    return f"jwt-auth:{user_id}"
+
+
+def get_decision(user_id):
+    """{"is_active", "is_admin"} en cache, ou None"""
+    shared = _shared()
+    if shared is not None:
+        return shared.get(_key(user_id))
+    with _lock:
+        return _local.get(str(user_id))
+
+
+def set_decision(user_id, decision):
+    shared = _shared()
+    if shared is not None:
+        shared.set(_key(user_id), decision, timeout=_config().get('TTL', 5))
+        return
+    with _lock:
+        _local[str(user_id)] = decision
+
+
+def invalidate_user(user_id):
+    """À appeler après toute écriture sur un utilisateur"""
+    if user_id is None:
+        return
+    with _lock:
+        _local.pop(str(user_id), None)
+    shared = _shared()
+    if shared is not None:
+        shared.delete(_key(user_id))
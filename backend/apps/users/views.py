@@ -1,18 +1,16 @@
 import os
 import random
-import secrets
 import datetime
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
-from django.core.mail import send_mail
 from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests 
+
+from core.streaming import stream_json_list
 
 # Imports locaux
 from .serializers import (
@@ -20,7 +18,9 @@ from .serializers import (
     UpdateProfileSerializer, AdminUserSerializer, PointsHistorySerializer
 )
 from .models import User, PasswordResetCode, PointsHistory
-from .authentication import generate_tokens, JWTAuthentication
+from .google_certs import google_certs
+from .outbox import enqueue_email
+from .authentication import generate_tokens, refresh_tokens, InvalidRefreshToken, JWTAuthentication
 
 
 # =================================================================
@@ -40,9 +40,9 @@ class GoogleLoginView(APIView):
             return Response({"error": "Token Google manquant"}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            # 1. Vérifier le token Google
+            # 1. Vérifier le token Google (certificats en cache, vérification locale)
             CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID')
-            id_info = id_token.verify_oauth2_token(token, google_requests.Request(), CLIENT_ID)
+            id_info = google_certs.verify(token, CLIENT_ID)
 
             # 2. Extraire les infos
             email = id_info.get('email')
@@ -82,8 +82,10 @@ class GoogleLoginView(APIView):
             else:
                 # --- SCÉNARIO INSCRIPTION ---
                 print(f"✨ Création nouveau compte Google pour : {email}")
-                random_password = secrets.token_urlsafe(16)
 
+                # Pas de mot de passe : check_password() refuse toujours un
+                # compte sans hash ; l'utilisateur peut en définir un via
+                # "mot de passe oublié".
                 new_user = User(
                     email=email,
                     first_name=first_name,
@@ -94,8 +96,6 @@ class GoogleLoginView(APIView):
                     points=0,
                     is_active=True
                 )
-                
-                new_user.set_password(random_password)
                 new_user.save()
 
                 tokens = generate_tokens(new_user)
@@ -120,8 +120,8 @@ class AdminUserListView(APIView):
 
     def get(self, request):
         users = User.objects.all().order_by('-date_joined')
-        serializer = AdminUserSerializer(users, many=True)
-        return Response(serializer.data)
+        # Envoi en flux, par lots : mémoire constante (voir core/streaming.py)
+        return stream_json_list(users, AdminUserSerializer)
 
     def post(self, request):
         data = request.data
@@ -243,6 +243,28 @@ class RegisterView(APIView):
             }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@method_decorator(csrf_exempt, name='dispatch')
+class TokenRefreshView(APIView):
+    """
+    {"refresh": "<refresh token>"} -> {"access", "refresh"}
+    Renouvelle l'access token sans repasser par le mot de passe.
+    """
+    permission_classes = [AllowAny]
+    # L'access token expiré éventuellement envoyé ne doit pas bloquer l'appel
+    authentication_classes = []
+
+    def post(self, request):
+        token = request.data.get('refresh')
+        if not token:
+            return Response({"error": "Refresh token manquant"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            tokens = refresh_tokens(token)
+        except InvalidRefreshToken as e:
+            return Response({"error": str(e)}, status=status.HTTP_401_UNAUTHORIZED)
+
+        return Response({"tokens": tokens}, status=status.HTTP_200_OK)
+
 # 👇👇👇 ET SURTOUT ICI POUR LE LOGIN 👇👇👇
 @method_decorator(csrf_exempt, name='dispatch')
 class LoginView(APIView):
@@ -257,6 +279,12 @@ class LoginView(APIView):
             user = User.objects(email=email).first()
             
             if user and user.check_password(password):
+                # Coût bcrypt modifié depuis le dernier hash : on rehache
+                try:
+                    user.upgrade_password(password)
+                except Exception as e:
+                    print(f"Erreur rehash mot de passe: {e}")
+
                 tokens = generate_tokens(user)
                 return Response({
                     "user": UserSerializer(user).data,
@@ -315,13 +343,13 @@ class ForgotPasswordView(APIView):
         PasswordResetCode.objects(user=user).delete()
         PasswordResetCode(user=user, code=code).save()
 
+        # Mise en file (outbox.py) puis envoi SMTP (réessayé plus tard en cas d'échec)
         try:
-            send_mail(
+            enqueue_email(
                 subject="Réinitialisation mot de passe - Bahri Fishing",
-                message=f"Votre code de confirmation est : {code}",
+                body=f"Votre code de confirmation est : {code}",
+                to=[email],
                 from_email=getattr(settings, 'EMAIL_HOST_USER', 'noreply@bahrifishing.com'),
-                recipient_list=[email],
-                fail_silently=False,
             )
         except Exception as e:
             return Response({"error": f"Erreur d'envoi d'email: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
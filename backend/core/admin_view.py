@@ -3,41 +3,95 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny 
 from rest_framework import status
 from decimal import Decimal
+from datetime import timedelta
+from mongoengine.queryset.visitor import Q
+
+from core.pagination import InvalidCursor, is_paginated, paginate_keyset
+from core.streaming import stream_json_list
 
 # Import des modèles
 from apps.orders.models import Order
-from apps.users.models import User
-from apps.products.models import Product
+from apps.products.stock import reserve_stock
 from apps.orders.serializers import OrderSerializer
+from apps.orders.stats import BUCKET_FORMATS, counter_stats, counters_ready, dashboard_stats, parse_day
+from apps.orders.counters import record_order, record_status_change
 
 # =========================================================
 # 1. STATISTIQUES DASHBOARD
 # =========================================================
 class AdminDashboardStats(APIView):
+    """
+    Chiffres du dashboard, lus depuis les compteurs SalesCounter.
+    Filtres optionnels : ?from=YYYY-MM-DD&to=YYYY-MM-DD&bucket=day|week
+    ?source=live : recalcul complet sur la collection Order (contrôle) ;
+    c'est aussi le mode utilisé tant que les compteurs n'ont pas été construits.
+    """
     permission_classes = [AllowAny]
 
     def get(self, request):
-        orders = Order.objects(status__in=['VALIDATED', 'DELIVERED', 'SHIPPED'])
-        revenue = sum(o.final_total for o in orders)
-        
-        return Response({
-            "total_orders": Order.objects.count(),
-            "pending_orders": Order.objects(status='PENDING').count(),
-            "total_users": User.objects.count(),
-            "total_products": Product.objects.count(),
-            "revenue": revenue
-        })
+        params = request.query_params
+        bucket = params.get('bucket')
+        if bucket and bucket not in BUCKET_FORMATS:
+            return Response({"error": "bucket doit valoir 'day' ou 'week'"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            date_from = parse_day(params['from']) if params.get('from') else None
+            date_to = parse_day(params['to']) if params.get('to') else None
+        except ValueError:
+            return Response({"error": "Format de date attendu : YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+
+        live = params.get('source') == 'live' or not counters_ready()
+        compute = dashboard_stats if live else counter_stats
+        return Response(compute(date_from, date_to, bucket))
 
 # =========================================================
 # 3. LISTE DES COMMANDES
 # =========================================================
 class AdminOrderListView(APIView):
+    """
+    Liste des commandes (plus récentes d'abord).
+    Filtres : ?status=PENDING&from=YYYY-MM-DD&to=YYYY-MM-DD&city=Tunis&q=<début email ou téléphone>
+    Pagination : ?page_size=50&cursor=... -> {"results": [...], "next_cursor": ...}
+    """
     permission_classes = [AllowAny]
 
     def get(self, request):
-        orders = Order.objects.order_by('-created_at')
-        serializer = OrderSerializer(orders, many=True)
-        return Response(serializer.data)
+        params = request.query_params
+        orders = Order.objects
+
+        try:
+            date_from = parse_day(params['from']) if params.get('from') else None
+            date_to = parse_day(params['to']) if params.get('to') else None
+        except ValueError:
+            return Response({"error": "Format de date attendu : YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if date_from:
+            orders = orders.filter(created_at__gte=date_from)
+        if date_to:
+            orders = orders.filter(created_at__lt=date_to + timedelta(days=1))
+
+        if params.get('status'):
+            orders = orders.filter(status__in=params['status'].split(','))
+
+        if params.get('city'):
+            orders = orders.filter(city=params['city'])
+
+        # Préfixe ancré (^...) : la recherche reste servie par les index email / phone
+        search = params.get('q', '').strip()
+        if search:
+            orders = orders.filter(Q(email__startswith=search) | Q(phone__startswith=search))
+
+        if not is_paginated(request):
+            # Liste complète : envoyée en flux, par lots (voir core/streaming.py)
+            return stream_json_list(orders.order_by('-created_at', '-id'), OrderSerializer)
+
+        try:
+            page, next_cursor = paginate_keyset(orders, request, field='created_at')
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = OrderSerializer(page, many=True)
+        return Response({"results": serializer.data, "next_cursor": next_cursor})
 
 # =========================================================
 # 4. MISE A JOUR STATUT (CORRIGÉE : POST ACCEPTÉ)
@@ -60,21 +114,22 @@ class AdminUpdateOrderStatus(APIView):
         previous_status = order.status
 
         # --- GESTION DU STOCK ---
+        # $inc conditionnels, tout ou rien (voir products/stock.py) :
+        # sans stock suffisant, la commande n'est PAS validée (409)
         if new_status == 'VALIDATED' and previous_status != 'VALIDATED':
             if order.items:
-                for item in order.items:
-                    try:
-                        p_id = item.product.id if hasattr(item.product, 'id') else item.product
-                        product = Product.objects(id=p_id).first()
-                        
-                        if product:
-                            current_stock = int(product.stock)
-                            qty_bought = int(item.quantity)
-                            new_stock = max(0, current_stock - qty_bought)
-                            product.stock = new_stock
-                            product.save()
-                    except Exception as e:
-                        print(f"Erreur stock: {e}")
+                lines = [(item.get('product'), int(item.get('quantity') or 0)) for item in order.items]
+                try:
+                    stock_errors = reserve_stock(lines)
+                except Exception as e:
+                    print(f"Erreur stock: {e}")
+                    return Response({"error": "Réservation du stock impossible"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                if stock_errors:
+                    print(f"Stock insuffisant: {stock_errors}")
+                    return Response({
+                        "error": "Stock insuffisant",
+                        "stock_errors": stock_errors
+                    }, status=status.HTTP_409_CONFLICT)
 
         # --- GESTION FIDÉLITÉ (Champ 'points') ---
         if new_status in ['VALIDATED', 'DELIVERED'] and previous_status == 'PENDING':
@@ -93,6 +148,11 @@ class AdminUpdateOrderStatus(APIView):
         order.status = new_status
         order.save()
 
+        try:
+            record_status_change(order, previous_status, new_status)
+        except Exception as e:
+            print(f"Erreur compteurs: {e}")
+
         return Response({
             "message": f"Statut mis à jour : {new_status}",
             "order": OrderSerializer(order).data
@@ -104,6 +164,10 @@ class AdminDeleteOrder(APIView):
     def delete(self, request, order_id):
         order = Order.objects(id=order_id).first()
         if order:
+            try:
+                record_order(order, sign=-1)
+            except Exception as e:
+                print(f"Erreur compteurs: {e}")
             order.delete()
             return Response({"message": "Commande supprimée"}, status=status.HTTP_200_OK)
         return Response({"error": "Non trouvé"}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
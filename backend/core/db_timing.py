@@ -0,0 +1,177 @@
+# backend/core/db_timing.py
+"""
+Instrumentation des commandes MongoDB, par requête HTTP.
+
+Un CommandListener pymongo (branché dans mongoengine.connect, voir
+settings.py) mesure chaque commande envoyée au serveur. Le middleware
+MongoTimingMiddleware ouvre un compteur par requête et, à la fin :
+- ajoute un en-tête `Server-Timing` (nombre de commandes, temps total,
+  commande la plus lente), visible dans l'onglet Réseau du navigateur ;
+- écrit une ligne de log structurée (JSON) par requête.
+
+Toute commande plus lente que MONGO_TIMING['SLOW_MS'] est journalisée
+avec la FORME de son filtre (valeurs remplacées par "?"), y compris
+depuis les threads d'arrière-plan.
+
+Les pymongo events sont émis dans le thread qui exécute la commande : un
+ContextVar suffit pour rattacher chaque commande à sa requête.
+"""
+import json
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('mongo_request_stats', default=None)
+# Commandes en cours (thread courant) : request_id -> (nom, collection, commande)
+_started = threading.local()
+
+
+def _config():
+    return getattr(settings, 'MONGO_TIMING', {})
+
+
+# =========================================================
+# FORME DES FILTRES (sans les valeurs)
+# =========================================================
+def _shape(value):
+    if isinstance(value, dict):
+        return {key: _shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # $and / $or : on garde la structure ; listes de valeurs : "?"
+        if value and all(isinstance(item, dict) for item in value):
+            return [_shape(item) for item in value]
+        return '?'
+    return '?'
+
+
+def filter_shape(command_name, command):
+    """Partie "requête" d'une commande, valeurs masquées"""
+    if command_name == 'find':
+        return {'filter': _shape(command.get('filter', {})), 'sort': command.get('sort')}
+    if command_name == 'aggregate':
+        return [
+            {stage: _shape(spec) if stage == '$match' else '…'}
+            for step in command.get('pipeline', [])
+            for stage, spec in step.items()
+        ]
+    if command_name in ('count', 'findAndModify', 'distinct'):
+        return _shape(command.get('query', {}))
+    if command_name == 'update':
+        return [_shape(op.get('q', {})) for op in command.get('updates', [])[:3]]
+    if command_name == 'delete':
+        return [_shape(op.get('q', {})) for op in command.get('deletes', [])[:3]]
+    return None
+
+
+# =========================================================
+# STATISTIQUES D'UNE REQUÊTE
+# =========================================================
+class RequestStats:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest = None  # (durée ms, commande, collection)
+
+    def add(self, duration_ms, command_name, collection):
+        self.count += 1
+        self.total_ms += duration_ms
+        if self.slowest is None or duration_ms > self.slowest[0]:
+            self.slowest = (duration_ms, command_name, collection)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Mesure chaque commande ; à passer dans event_listeners=[...]"""
+
+    def _pending(self):
+        if not hasattr(_started, 'commands'):
+            _started.commands = {}
+        return _started.commands
+
+    def started(self, event):
+        command_name = event.command_name
+        collection = event.command.get(command_name)
+        self._pending()[event.request_id] = (
+            command_name,
+            collection if isinstance(collection, str) else None,
+            event.command,
+        )
+
+    def _finished(self, event, failed=False):
+        info = self._pending().pop(event.request_id, None)
+        if info is None:
+            return
+        command_name, collection, command = info
+        duration_ms = event.duration_micros / 1000.0
+
+        stats = _current.get()
+        if stats is not None:
+            stats.add(duration_ms, command_name, collection)
+
+        if duration_ms >= _config().get('SLOW_MS', 100) or failed:
+            logger.warning(json.dumps({
+                'event': 'mongo_slow_command' if not failed else 'mongo_failed_command',
+                'command': command_name,
+                'collection': collection,
+                'duration_ms': round(duration_ms, 2),
+                'shape': filter_shape(command_name, command),
+            }, default=str))
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        self._finished(event, failed=True)
+
+
+# =========================================================
+# MIDDLEWARE
+# =========================================================
+class MongoTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not _config().get('ENABLED', True):
+            return self.get_response(request)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        metrics = [f'db;dur={stats.total_ms:.1f};desc="{stats.count} commandes"']
+        if stats.slowest:
+            duration_ms, command_name, collection = stats.slowest
+            desc = f"{command_name} {collection or ''}".strip()
+            metrics.append(f'dbmax;dur={duration_ms:.1f};desc="{desc}"')
+        metrics.append(f'app;dur={elapsed_ms:.1f}')
+        response['Server-Timing'] = ', '.join(metrics)
+
+        if _config().get('LOG_REQUESTS', True):
+            logger.info(json.dumps({
+                'event': 'request',
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round(elapsed_ms, 2),
+                'db_commands': stats.count,
+                'db_ms': round(stats.total_ms, 2),
+                'db_slowest': {
+                    'command': stats.slowest[1],
+                    'collection': stats.slowest[2],
+                    'duration_ms': round(stats.slowest[0], 2),
+                } if stats.slowest else None,
+                # Corps envoyé en flux : ses requêtes ne sont pas comptées
+                'streaming': response.streaming,
+            }))
+        return response
@@ -0,0 +1,149 @@
+# backend/core/pagination.py
+"""
+Pagination par curseur (keyset) pour les listes MongoEngine.
+
+Au lieu d'un `skip()` qui relit toutes les pages précédentes, on filtre
+directement sur le couple (champ de tri, id) du dernier élément renvoyé :
+le coût d'une page reste constant quelle que soit sa position.
+"""
+import base64
+import json
+from datetime import datetime
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from django.conf import settings
+from mongoengine.queryset.visitor import Q
+
+
+# Curseur suivant des réponses non enveloppées (tableau nu)
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+class InvalidCursor(ValueError):
+    """Curseur illisible ou falsifié"""
+
+
+def is_paginated(request):
+    """Le client demande-t-il une réponse paginée ?"""
+    params = request.query_params
+    return 'cursor' in params or 'page_size' in params
+
+
+def get_page_size(request):
+    """Taille de page demandée, bornée par API_MAX_PAGE_SIZE"""
+    default = getattr(settings, 'API_PAGE_SIZE', 24)
+    maximum = getattr(settings, 'API_MAX_PAGE_SIZE', 100)
+    try:
+        size = int(request.query_params.get('page_size', default))
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, maximum))
+
+
+# =========================================================
+# ENCODAGE DU CURSEUR
+# =========================================================
+def _encode(payload):
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+
+
+def encode_cursor(value, pk):
+    """(valeur de tri, id) -> chaîne opaque pour l'URL"""
+    if isinstance(value, datetime):
+        payload = {'v': value.isoformat(), 't': 'dt'}
+    else:
+        payload = {'v': float(value) if value is not None else None}
+    payload['id'] = str(pk)
+    return _encode(payload)
+
+
+def decode_cursor(cursor):
+    """Chaîne opaque -> (valeur de tri, ObjectId)"""
+    try:
+        payload = _decode(cursor)
+        value = payload['v']
+        if payload.get('t') == 'dt':
+            value = datetime.fromisoformat(value)
+        return value, ObjectId(payload['id'])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise InvalidCursor(f"Curseur invalide : {cursor}") from e
+
+
+# =========================================================
+# PAGINATION
+# =========================================================
+def _after(field, value, pk, descending):
+    """Filtre "strictement après (value, pk)" dans l'ordre de tri"""
+    op = 'lt' if descending else 'gt'
+    if value is None:
+        # Les valeurs nulles sont en fin de liste en tri décroissant,
+        # en début de liste en tri croissant.
+        same = Q(**{field: None, f'id__{op}': pk})
+        return same if descending else same | Q(**{f'{field}__ne': None})
+
+    after = Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'id__{op}': pk})
+    if descending:
+        after = after | Q(**{field: None})
+    return after
+
+
+def paginate_keyset(queryset, request, field='created_at', descending=True):
+    """
+    Applique tri + curseur + limite sur un QuerySet.
+    Retourne (documents de la page, curseur suivant ou None).
+    Lève InvalidCursor si le curseur reçu est illisible.
+    """
+    size = get_page_size(request)
+    cursor = request.query_params.get('cursor')
+
+    if cursor:
+        value, pk = decode_cursor(cursor)
+        queryset = queryset.filter(_after(field, value, pk, descending))
+
+    direction = '-' if descending else ''
+    # On lit un document de plus pour savoir s'il existe une page suivante
+    docs = list(queryset.order_by(f'{direction}{field}', f'{direction}id').limit(size + 1))
+
+    next_cursor = None
+    if len(docs) > size:
+        docs = docs[:size]
+        last = docs[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.id)
+
+    return docs, next_cursor
+
+
+def paginate_ranked(queryset, ranked_ids, request):
+    """
+    Pagination d'une liste classée (ex : pertinence de recherche).
+    `ranked_ids` donne l'ordre ; `queryset` applique les autres filtres.
+    Le curseur est alors une position dans le classement.
+    Retourne (documents de la page, curseur suivant ou None).
+    """
+    size = get_page_size(request)
+    cursor = request.query_params.get('cursor')
+    offset = 0
+    if cursor:
+        try:
+            offset = max(0, int(_decode(cursor)['o']))
+        except (ValueError, KeyError, TypeError) as e:
+            raise InvalidCursor(f"Curseur invalide : {cursor}") from e
+
+    # Ids qui passent aussi les filtres MongoDB, dans l'ordre du classement
+    allowed = set(queryset.filter(id__in=ranked_ids).scalar('id'))
+    ordered = [pk for pk in ranked_ids if pk in allowed]
+    page_ids = ordered[offset:offset + size]
+
+    docs = {doc.id: doc for doc in queryset.filter(id__in=page_ids)}
+    page = [docs[pk] for pk in page_ids if pk in docs]
+
+    next_offset = offset + size
+    next_cursor = _encode({'o': next_offset}) if next_offset < len(ordered) else None
+    return page, next_cursor
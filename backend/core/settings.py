@@ -10,6 +10,8 @@ import cloudinary
 import cloudinary.uploader
 import cloudinary.api
 
+from core.db_timing import MongoCommandListener
+
 # Charge les variables d'environnement
 load_dotenv()
 
@@ -55,6 +57,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',       # <--- EN PREMIER !
+    'core.db_timing.MongoTimingMiddleware',        # Server-Timing + log MongoDB par requête
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -125,6 +128,11 @@ CORS_ALLOW_METHODS = [
     'PUT',
 ]
 
+# En-têtes de réponse lisibles par le frontend (curseur des listes paginées)
+CORS_EXPOSE_HEADERS = [
+    'x-next-cursor',
+]
+
 
 # =========================================================
 # 🗄️ BASE DE DONNÉES (MONGODB ATLAS)
@@ -142,7 +150,9 @@ if MONGO_URI:
     mongoengine.connect(
         db="bahri_fishing_db",
         host=MONGO_URI,
-        alias="default"
+        alias="default",
+        # Mesure des commandes MongoDB (core/db_timing.py)
+        event_listeners=[MongoCommandListener()]
     )
 else:
     print("⚠️ ERREUR CRITIQUE : MONGO_URI MANQUANT")
@@ -182,6 +192,86 @@ REST_FRAMEWORK = {
     "UNAUTHENTICATED_USER": None,
 }
 
+# Hachage des mots de passe (apps/users/hashing.py)
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))                 # coût bcrypt cible
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))  # hachages simultanés max
+
+# Certificats publics de Google pour vérifier les ID tokens (apps/users/google_certs.py)
+GOOGLE_CERTS_URL = os.environ.get('GOOGLE_CERTS_URL', 'https://www.googleapis.com/oauth2/v1/certs')
+
+# Rotation des refresh tokens : chaque refresh token ne sert qu'une fois
+JWT_ROTATE_REFRESH_TOKENS = os.environ.get('JWT_ROTATE_REFRESH_TOKENS', 'true').lower() in ('1', 'true', 'yes')
+
+# Cache des décisions d'authentification JWT (apps/users/user_cache.py)
+JWT_USER_CACHE = {
+    'TTL': int(os.environ.get('JWT_USER_CACHE_TTL', 5)),           # secondes
+    'MAXSIZE': int(os.environ.get('JWT_USER_CACHE_MAXSIZE', 2048)),
+    # Alias de CACHES partagé entre workers (ex : Redis), optionnel
+    'SHARED_CACHE': os.environ.get('JWT_USER_CACHE_SHARED') or None,
+}
+
+# Cache des réponses publiques du catalogue (apps/products/cache.py)
+CATALOG_CACHE = {
+    'ALIAS': os.environ.get('CATALOG_CACHE_ALIAS', 'default'),
+    'TTL': int(os.environ.get('CATALOG_CACHE_TTL', 60)),           # secondes
+    'MAX_AGE': int(os.environ.get('CATALOG_CACHE_MAX_AGE', 0)),    # Cache-Control navigateur / CDN
+    # Relecture de la version partagée (document MongoDB), en secondes
+    'VERSION_TTL': int(os.environ.get('CATALOG_VERSION_TTL', 5)),
+}
+
+# Registre des catégories en mémoire (apps/products/registry.py)
+CATEGORY_REGISTRY_TTL = int(os.environ.get('CATEGORY_REGISTRY_TTL', 300))  # secondes
+
+# Index de recherche en mémoire (apps/products/search.py)
+SEARCH_INDEX = {
+    'TTL': int(os.environ.get('SEARCH_INDEX_TTL', 300)),           # reconstruction complète (s)
+    'MAX_RESULTS': int(os.environ.get('SEARCH_MAX_RESULTS', 500)),
+}
+
+# Envoi asynchrone des images produits (apps/products/uploads.py)
+IMAGE_UPLOADS = {
+    'SPOOL_DIR': os.environ.get('IMAGE_UPLOAD_SPOOL_DIR') or None,  # défaut : dossier temporaire
+    # Pool de threads : serveurs en continu uniquement (pas sur Vercel)
+    'ASYNC': os.environ.get('IMAGE_UPLOAD_ASYNC', 'false').lower() in ('1', 'true', 'yes'),
+    'WORKERS': int(os.environ.get('IMAGE_UPLOAD_WORKERS', 2)),
+    'RETRIES': int(os.environ.get('IMAGE_UPLOAD_RETRIES', 3)),
+    'BACKOFF': float(os.environ.get('IMAGE_UPLOAD_BACKOFF', 2)),     # secondes, doublé à chaque essai
+    'LOCK_SECONDS': int(os.environ.get('IMAGE_UPLOAD_LOCK_SECONDS', 300)),  # réservation d'un envoi
+}
+
+# Réduction des photos avant envoi (apps/products/image_processing.py)
+IMAGE_PROCESSING = {
+    'ENABLED': os.environ.get('IMAGE_PROCESSING', 'true').lower() in ('1', 'true', 'yes'),
+    'MAX_SIZE': int(os.environ.get('IMAGE_MAX_SIZE', 1600)),       # côté le plus long (px)
+    'MAX_PIXELS': int(os.environ.get('IMAGE_MAX_PIXELS', 40_000_000)),  # au-delà : pas de décodage
+    'FORMAT': os.environ.get('IMAGE_FORMAT', 'WEBP'),              # WEBP ou JPEG
+    'QUALITY': int(os.environ.get('IMAGE_QUALITY', 82)),
+}
+
+# Instrumentation MongoDB par requête (core/db_timing.py)
+MONGO_TIMING = {
+    'ENABLED': os.environ.get('MONGO_TIMING', 'true').lower() in ('1', 'true', 'yes'),
+    'SLOW_MS': float(os.environ.get('MONGO_SLOW_MS', 100)),   # seuil de log des commandes lentes
+    'LOG_REQUESTS': os.environ.get('MONGO_TIMING_LOG', 'true').lower() in ('1', 'true', 'yes'),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.db_timing': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+# Pagination par curseur (core/pagination.py)
+API_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', 24))
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 100))
+# Taille des lots des listes admin envoyées en flux (core/streaming.py)
+API_STREAM_BATCH_SIZE = int(os.environ.get('API_STREAM_BATCH_SIZE', 200))
+
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
 USE_I18N = True
@@ -194,13 +284,25 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
-EMAIL_HOST = 'smtp.gmail.com'
-EMAIL_PORT = 587
-EMAIL_USE_TLS = True
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'smtp.gmail.com')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 587))
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'true').lower() in ('1', 'true', 'yes')
+EMAIL_TIMEOUT = int(os.environ.get('EMAIL_TIMEOUT', 20))
 
 # 👇 On récupère les valeurs secrètes depuis Vercel
 EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD')
 
 DEFAULT_FROM_EMAIL = f"Bahri Fishing <{EMAIL_HOST_USER}>"
+
+# File d'attente des emails sortants (apps/users/outbox.py)
+EMAIL_OUTBOX = {
+    # Thread d'envoi : serveurs en continu uniquement (pas sur Vercel)
+    'ASYNC': os.environ.get('EMAIL_OUTBOX_ASYNC', 'false').lower() in ('1', 'true', 'yes'),
+    'BATCH_SIZE': int(os.environ.get('EMAIL_OUTBOX_BATCH_SIZE', 50)),      # emails par connexion SMTP
+    'MAX_ATTEMPTS': int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 5)),
+    'BACKOFF': int(os.environ.get('EMAIL_OUTBOX_BACKOFF', 30)),            # secondes, doublé à chaque essai
+    'POLL_INTERVAL': int(os.environ.get('EMAIL_OUTBOX_POLL_INTERVAL', 30)),
+    'LOCK_SECONDS': 300,  # un email réservé par un worker mort est repris ensuite
+}
 SECURE_CROSS_ORIGIN_OPENER_POLICY = 'same-origin-allow-popups'
\ No newline at end of file
@@ -0,0 +1,84 @@
+# backend/core/streaming.py
+"""
+Réponses JSON en flux pour les grandes listes de l'admin.
+
+Au lieu de sérialiser toute la collection en mémoire avant de répondre,
+on parcourt le curseur MongoDB par lots (batch_size) et on envoie le
+tableau JSON morceau par morceau via StreamingHttpResponse. La mémoire
+utilisée reste celle d'un lot, quelle que soit la taille de la liste.
+Le client reçoit exactement le même tableau JSON qu'avec Response().
+
+Erreurs :
+- le premier lot est lu et sérialisé AVANT de renvoyer la réponse : une
+  erreur à ce stade (requête invalide, base injoignable...) remonte dans la
+  vue et passe par le gestionnaire d'exceptions de DRF (vrai code d'erreur) ;
+- une fois le flux commencé, le statut 200 est déjà parti. Une erreur sur
+  un lot suivant est journalisée et le tableau est terminé proprement par
+  un dernier élément STREAM_ERROR ({"error": ...}) : le JSON reste
+  valide et le client peut détecter une liste incomplète.
+"""
+import json
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def _batches(queryset, size):
+    batch = []
+    for doc in queryset.batch_size(size):
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# Dernier élément du tableau quand le flux a été interrompu par une erreur
+STREAM_ERROR = {"error": "Liste incomplète : erreur pendant l'envoi"}
+
+
+def _encode_batch(encoder, batch, serializer_class, context, prepare):
+    batch_context = dict(context)
+    if prepare is not None:
+        # Données partagées par le lot (ex : catégories préchargées)
+        batch_context.update(prepare(batch))
+    data = serializer_class(batch, many=True, context=batch_context).data
+    return ','.join(encoder.encode(item) for item in data)
+
+
+def _iter_json_array(first_chunk, batches, encode):
+    # Le premier lot est déjà sérialisé (voir stream_json_list)
+    yield '[' + first_chunk
+    separator = ',' if first_chunk else ''
+    try:
+        for batch in batches:
+            # Un morceau envoyé par lot
+            yield separator + encode(batch)
+            separator = ','
+    except Exception as e:
+        print(f"❌ Erreur pendant l'envoi d'une liste en flux : {e}")
+        yield separator + json.dumps(STREAM_ERROR, ensure_ascii=False)
+    yield ']'
+
+
+def stream_json_list(queryset, serializer_class, context=None, prepare=None):
+    """
+    StreamingHttpResponse contenant le tableau JSON sérialisé de `queryset`.
+    `prepare(batch)` peut renvoyer un dict ajouté au contexte de chaque lot.
+    Les erreurs sur le premier lot sont levées ici, dans la vue.
+    """
+    size = getattr(settings, 'API_STREAM_BATCH_SIZE', 200)
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+    def encode(batch):
+        return _encode_batch(encoder, batch, serializer_class, context or {}, prepare)
+
+    batches = _batches(queryset, size)
+    first = next(batches, None)
+    first_chunk = encode(first) if first else ''
+    return StreamingHttpResponse(
+        _iter_json_array(first_chunk, batches, encode),
+        content_type='application/json'
+    )
@@ -134,7 +134,8 @@ const AdminDashboard = () => {
                     setRefresh(prev => prev + 1);
                 } catch (err) {
                     console.error("Erreur update", err);
-                    showNotification('error', "Erreur lors de la mise à jour.");
+                    // 409 : stock insuffisant, la commande reste dans son statut
+                    showNotification('error', err.response?.data?.error || "Erreur lors de la mise à jour.");
                 }
             }
         });
@@ -3,19 +3,28 @@ import { useParams } from 'react-router-dom';
 import client from '../api/client';
 import ProductCard from '../components/ProductCard';
 
+const PAGE_SIZE = 24;
+
 const CategoryPage = () => {
     const { slug } = useParams(); // Récupère "moulinets" depuis l'URL
     const [products, setProducts] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [categoryName, setCategoryName] = useState('');
 
+    const fetchPage = (cursor) => client.get('/products/', {
+        params: { category: slug, page_size: PAGE_SIZE, cursor: cursor || undefined }
+    });
+
     useEffect(() => {
         const fetchProducts = async () => {
             setLoading(true);
             try {
-                // Appel API avec le filtre ?category=slug
-                const res = await client.get(`/products/?category=${slug}`);
-                setProducts(res.data);
+                // Appel API avec le filtre ?category=slug, paginé (page_size + cursor)
+                const res = await fetchPage(null);
+                setProducts(res.data.results);
+                setNextCursor(res.data.next_cursor);
                 
                 // Petit hack pour afficher un joli titre (on majuscule la 1ère lettre)
                 setCategoryName(slug.charAt(0).toUpperCase() + slug.slice(1).replace('-', ' '));
@@ -29,6 +38,19 @@ const CategoryPage = () => {
         fetchProducts();
     }, [slug]); // Se relance si on change de catégorie
 
+    const loadMore = async () => {
+        setLoadingMore(true);
+        try {
+            const res = await fetchPage(nextCursor);
+            setProducts(prev => [...prev, ...res.data.results]);
+            setNextCursor(res.data.next_cursor);
+        } catch (err) {
+            console.error("Erreur chargement catégorie", err);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     if (loading) return <div className="text-center py-20">Chargement du rayon...</div>;
 
     return (
@@ -48,6 +70,18 @@ const CategoryPage = () => {
                     ))}
                 </div>
             )}
+
+            {nextCursor && (
+                <div className="flex justify-center mt-10">
+                    <button
+                        onClick={loadMore}
+                        disabled={loadingMore}
+                        className="px-6 py-3 bg-bahri-blue text-white font-bold rounded-lg hover:opacity-90 transition disabled:opacity-50"
+                    >
+                        {loadingMore ? "Chargement..." : "Voir plus de produits"}
+                    </button>
+                </div>
+            )}
         </div>
     );
 };
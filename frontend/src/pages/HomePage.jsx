@@ -11,9 +11,9 @@ const HomePage = () => {
   useEffect(() => {
     const fetchProducts = async () => {
       try {
-        const res = await client.get('/products/');
-        // On garde seulement les 4 premiers (ou 8)
-        setProducts(res.data.slice(0, 4));
+        // L'API ne renvoie que les 4 premiers
+        const res = await client.get('/products/', { params: { page_size: 4 } });
+        setProducts(res.data.results);
       } catch (err) {
         console.error("Erreur chargement produits", err);
       }
@@ -5,20 +5,31 @@ import client from '../api/client';
 import ProductCard from '../components/ProductCard';
 import { PackageX } from 'lucide-react';
 
+const PAGE_SIZE = 24;
+
 const ProductsPage = () => {
   const [products, setProducts] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
 
   const [searchParams] = useSearchParams();
   const navigate = useNavigate(); // Hook de navigation
   const searchTerm = searchParams.get('search') || '';
 
+  // Liste paginée par l'API (page_size + cursor), recherche faite côté serveur
+  const fetchPage = (cursor) => client.get('/products/', {
+    params: { page_size: PAGE_SIZE, search: searchTerm || undefined, cursor: cursor || undefined }
+  });
+
   useEffect(() => {
     const fetchProducts = async () => {
+      setLoading(true);
       try {
-        const response = await client.get('/products/');
-        setProducts(response.data);
+        const response = await fetchPage(null);
+        setProducts(response.data.results);
+        setNextCursor(response.data.next_cursor);
       } catch (err) {
         console.error("Erreur API:", err);
         setError("Impossible de charger les produits.");
@@ -28,11 +39,20 @@ const ProductsPage = () => {
     };
 
     fetchProducts();
-  }, []);
+  }, [searchTerm]);
 
-  const filteredProducts = products.filter(product => 
-    product.title.toLowerCase().includes(searchTerm.toLowerCase())
-  );
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await fetchPage(nextCursor);
+      setProducts(prev => [...prev, ...response.data.results]);
+      setNextCursor(response.data.next_cursor);
+    } catch (err) {
+      console.error("Erreur API:", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   if (loading) return <div className="text-center mt-20 text-xl font-bold text-gray-500 animate-pulse">Chargement du matériel...</div>;
   if (error) return <div className="text-center mt-20 text-red-500 font-bold">{error}</div>;
@@ -48,8 +68,8 @@ const ProductsPage = () => {
       </h1>
       
       <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-4 gap-6">
-        {filteredProducts.length > 0 ? (
-            filteredProducts.map((product) => (
+        {products.length > 0 ? (
+            products.map((product) => (
               <ProductCard key={product.id} product={product} />
             ))
         ) : (
@@ -66,6 +86,18 @@ const ProductsPage = () => {
             </div>
         )}
       </div>
+
+      {nextCursor && (
+        <div className="flex justify-center mt-10">
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="px-6 py-3 bg-bahri-blue text-white font-bold rounded-lg hover:opacity-90 transition disabled:opacity-50"
+          >
+            {loadingMore ? "Chargement..." : "Voir plus de produits"}
+          </button>
+        </div>
+      )}
     </div>
   );
 };